@@ -1,18 +1,19 @@
 import streamlit as st
 import pandas as pd
-import hopsworks
-import matplotlib.pyplot as plt
 from streamlit_lottie import st_lottie
 import requests
-import lightgbm as lgb
-import joblib
-import os
-import seaborn as sns
+
+from src import config
+from src.dashboard_data import PredictionHistory, table_reader
+from src.feature_store import connect
+from src.model_cache import ModelCache
+from src.stations import published_catalog
 
 # --- Page Config ---
 st.set_page_config(page_title="CitiBike Predictions", layout="wide")
 
 # --- Lottie Animation ---
+@st.cache_data(ttl=24 * 3600)
 def load_lottie_url(url):
     r = requests.get(url)
     if r.status_code == 200:
@@ -22,19 +23,38 @@ def load_lottie_url(url):
 lottie_cycling = load_lottie_url("https://assets9.lottiefiles.com/packages/lf20_touohxv0.json")
 st_lottie(lottie_cycling, height=150)
 
-# --- Login to Hopsworks ---
-HOPSWORKS_API_KEY = st.secrets["HOPSWORKS_API_KEY"]
-HOPSWORKS_PROJECT = st.secrets["HOPSWORKS_PROJECT_NAME"]
+# --- Connect to the feature store (one connection per server process) ---
+# FEATURE_STORE=local serves the dashboard from the local Parquet store instead of Hopsworks.
+FEATURE_STORE = config.FEATURE_STORE
+
+@st.cache_resource(ttl=3600)
+def get_store():
+    if FEATURE_STORE == "local":
+        return connect("local")
+    return connect("hopsworks", st.secrets["HOPSWORKS_API_KEY"], st.secrets["HOPSWORKS_PROJECT_NAME"])
+
+# --- Station names by catalog code, from the catalog the feature pipeline publishes ---
+@st.cache_resource(ttl=3600)
+def get_stations():
+    return published_catalog(get_store())
+
+# --- Load Predictions (TTL-cached, only rows newer than the last prediction_time are fetched) ---
+# Rebuilt with the store connection; station names are looked up on every refresh, so they follow get_stations.
+@st.cache_resource(ttl=3600)
+def get_history():
+    table = get_store().table("citibike_hourly_predictions", version=2)
+    return PredictionHistory(table_reader(table), ttl_seconds=300, labels=lambda ids: get_stations().labels(ids))
 
-project = hopsworks.login(api_key_value=HOPSWORKS_API_KEY, project=HOPSWORKS_PROJECT)
-fs = project.get_feature_store()
-mr = project.get_model_registry()
+@st.cache_data(ttl=3600)
+def get_model_versions():
+    return sorted([m.version for m in get_store().model_registry().get_models("citibike_lightgbm_full")])
 
-# --- Load Predictions ---
-fg = fs.get_feature_group("citibike_hourly_predictions", version=1)
-query = fg.select_all()
-df = query.read()
-df["prediction_time"] = pd.to_datetime(df["prediction_time"])
+@st.cache_data(ttl=3600)
+def get_model_info(version):
+    model = get_store().model_registry().get_model("citibike_lightgbm_full", version=version)
+    return {"name": model.name, "version": model.version, "description": model.description}
+
+view = get_history().get().view
 
 # --- Header ---
 st.title("CitiBike Ride Predictions")
@@ -42,62 +62,51 @@ st.markdown("Real-time predictions for top NYC CitiBike pickup locations")
 
 # --- Latest Predictions ---
 st.markdown("## \U0001F504 Latest Predictions")
-latest_time = df["prediction_time"].max()
-df_latest = df[df["prediction_time"] == latest_time].sort_values("predicted_rides", ascending=False)
+latest_time = view.latest_time
 st.markdown(f"#### As of `{latest_time.strftime('%Y-%m-%d %H:%M:%S')} UTC`")
 
 # Redesigned card layout with icons
-prediction_cards = "<div style='display: flex; flex-wrap: wrap; gap: 1.5rem; justify-content: start;'>"
-for row in df_latest.itertuples():
-    prediction_cards += (
-        "<div style='background-color: #1e1e1e; padding: 1.5rem; border-radius: 12px; text-align: center; "
-        "width: 220px; box-shadow: 0 4px 8px rgba(0,0,0,0.3);'>"
-        f"<div style='font-size: 1.1rem; font-weight: 600; color: #9ca3af;'>📍 Location {row.location_id}</div>"
-        f"<div style='font-size: 2rem; font-weight: bold; color: #10b981; margin-top: 0.5rem;'>🚗 {row.predicted_rides} rides</div>"
-        "</div>"
-    )
-prediction_cards += "</div>"
-st.markdown(prediction_cards, unsafe_allow_html=True)
+st.markdown(view.cards_html, unsafe_allow_html=True)
 
 # --- Layout Split ---
 st.markdown("### Compare Top 3 Locations")
-top_locs = df["location_id"].value_counts().head(3).index.tolist()
-df_top3 = df[df["location_id"].isin(top_locs)].sort_values("prediction_time")
-df_pivot = df_top3.pivot(index="prediction_time", columns="location_id", values="predicted_rides")
-st.line_chart(df_pivot, height=300)
+st.line_chart(view.top_pivot, height=300)
 
 # --- Prediction Trends ---
 st.markdown("### Prediction Trend Over Time")
 col1, col2 = st.columns([3, 1])
 
 with col1:
-    location = st.selectbox("Trend: Select location:", df["location_id"].unique(), key="trend_loc")
-    df_loc = df[df["location_id"] == location].sort_values("prediction_time")
+    location = st.selectbox("Trend: Select location:", view.locations, key="trend_loc",
+                            format_func=lambda loc: get_stations().labels([loc])[0])
 
 with col2:
     hours = st.slider("Past hours:", min_value=6, max_value=168, value=24, step=6)
-    df_loc = df_loc.tail(hours)
 
-st.line_chart(df_loc.set_index("prediction_time")["predicted_rides"], height=300)
+st.line_chart(view.trend(location, hours), height=300)
 
 # --- Model Version and Metrics ---
 st.markdown("### Model Info & Feature Importance")
-model_versions = sorted([m.version for m in mr.get_models("citibike_lightgbm_full")])
+model_versions = get_model_versions()
 version = st.selectbox("Choose model version:", model_versions)
-model = mr.get_model("citibike_lightgbm_full", version=version)
+model = get_model_info(version)
 
 col_m1, col_m2 = st.columns(2)
 with col_m1:
-    st.markdown(f"- **Model Name:** `{model.name}`")
-    st.markdown(f"- **Version:** `{model.version}`")
-    st.markdown(f"- **Description:** {model.description}")
+    st.markdown(f"- **Model Name:** `{model['name']}`")
+    st.markdown(f"- **Version:** `{model['version']}`")
+    st.markdown(f"- **Description:** {model['description']}")
 
 # --- Feature Importance ---
 with col_m2:
-    model_dir = model.download()
-    model_path = os.path.join(model_dir, "lightgbm_full_model.pkl")
-    model_local = joblib.load(model_path)
-    booster = model_local.booster_
+    # Plotting libraries are only needed for this chart; importing them here keeps the first paint fast.
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    model_local = ModelCache(lambda: get_store().model_registry()).load(
+        "citibike_lightgbm_full", version, artifact="lightgbm_full_model.pkl", flat=True,
+    )
+    booster = getattr(model_local, "booster_", model_local)
     importance_df = pd.DataFrame({
         "Feature": booster.feature_name(),
         "Importance": booster.feature_importance()
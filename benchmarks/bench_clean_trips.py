@@ -0,0 +1,54 @@
+"""Trip cleaning: pandas `clean_trips` vs the Arrow-native `clean_trips_arrow`.
+
+Both engines read the same synthetic archive in one chunk; the benchmark
+checks they return identical frames and times the cleaning step alone.
+
+Usage: python benchmarks/bench_clean_trips.py --trips 1000000 --stations 2000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from synthetic import write_month_zip
+from src.ingest import clean_trips, clean_trips_arrow, iter_trip_chunks, iter_trip_tables
+from src.stations import StationCatalog
+
+
+def best_of(fn, arg, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = write_month_zip(Path(tmp) / "trips.zip", args.trips, args.stations)
+        frame = next(iter_trip_chunks(zip_path, chunksize=args.trips))
+        table = next(iter_trip_tables(zip_path, chunksize=args.trips))
+
+    stations = StationCatalog(path=None)
+    pandas_time, expected = best_of(lambda df: clean_trips(df.copy(), stations), frame, args.repeats)
+    arrow_time, result = best_of(lambda trips: clean_trips_arrow(trips, stations), table, args.repeats)
+    pd.testing.assert_frame_equal(result, expected)
+
+    print(f"trips={args.trips:,}  kept={len(expected):,}")
+    print(f"pandas clean_trips      {pandas_time:.3f}s")
+    print(f"arrow  clean_trips_arrow {arrow_time:.3f}s  ({pandas_time / arrow_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
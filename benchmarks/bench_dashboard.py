@@ -0,0 +1,75 @@
+"""Benchmark the dashboard's data prep: the original per-rerun code vs DashboardView.
+
+Usage: python benchmarks/bench_dashboard.py --stations 2000 --hours 720
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.dashboard_view import DashboardView
+
+
+def synthetic_history(n_stations, n_hours, seed=42):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2025-01-01", periods=n_hours, freq="h", tz="UTC")
+    stations = rng.choice(10_000, size=n_stations, replace=False)
+    df = pd.DataFrame({
+        "location_id": np.tile(stations, n_hours),
+        "predicted_rides": rng.poisson(5, size=n_stations * n_hours),
+        "prediction_time": np.repeat(times, n_stations),
+    })
+    # PredictionHistory hands the view a history sorted by prediction_time.
+    return df
+
+
+def original_rerun(df, location, hours):
+    """What app.py did on every widget interaction before the view model."""
+    latest_time = df["prediction_time"].max()
+    df_latest = df[df["prediction_time"] == latest_time].sort_values("predicted_rides", ascending=False)
+    cards = "<div>"
+    for row in df_latest.itertuples():
+        cards += f"<div>📍 Location {row.location_id}</div><div>🚗 {row.predicted_rides} rides</div>"
+    cards += "</div>"
+    top_locs = df["location_id"].value_counts().head(3).index.tolist()
+    df_top3 = df[df["location_id"].isin(top_locs)].sort_values("prediction_time")
+    df_top3.pivot(index="prediction_time", columns="location_id", values="predicted_rides")
+    df_loc = df[df["location_id"] == location].sort_values("prediction_time").tail(hours)
+    return df_loc.set_index("prediction_time")["predicted_rides"]
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--hours", type=int, default=720)
+    args = parser.parse_args()
+
+    df = synthetic_history(args.stations, args.hours)
+    location = df["location_id"].iloc[0]
+
+    expected, original_time = timed(original_rerun, df, location, 24, repeat=3)
+    view, build_time = timed(DashboardView, df, repeat=3)
+    trend, trend_time = timed(view.trend, location, 24, repeat=100)
+    pd.testing.assert_series_equal(trend, expected, check_freq=False)
+
+    print(f"history rows={len(df):,} stations={args.stations}")
+    print(f"original prep per rerun:        {original_time * 1e3:9.1f} ms")
+    print(f"DashboardView build per refresh:{build_time * 1e3:9.1f} ms")
+    print(f"DashboardView per rerun (trend):{trend_time * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Local feature store: bulk background writes and pushdown reads vs a full read.
+
+Usage: python benchmarks/bench_feature_store.py --stations 2000 --days 30
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from bench_lag_features import synthetic_grid
+from src.feature_store import connect
+from src.features import make_lag_features_batched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    features = make_lag_features_batched(synthetic_grid(args.stations, args.days * 24 + 28))
+    features["pickup_hour"] = features["pickup_hour"].dt.tz_localize("UTC")
+    hourly_batches = [batch for _, batch in features.groupby("pickup_hour")]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = connect("local", root=root)
+        table = store.table("features", primary_key=["pickup_location_id", "pickup_hour"], event_time="pickup_hour")
+
+        start = time.perf_counter()
+        for batch in hourly_batches:
+            table.insert(batch)
+        queued = time.perf_counter() - start
+        store.flush()
+        written = time.perf_counter() - start
+        print(f"rows={len(features):,}  {len(hourly_batches)} hourly inserts queued in {queued * 1000:.1f} ms, "
+              f"on disk after {written:.2f}s")
+
+        # Re-inserting a day upserts by primary key instead of appending.
+        table.insert(hourly_batches[-1], wait=True)
+        assert len(table.read(columns=["pickup_location_id"])) == len(features)
+
+        since = features["pickup_hour"].max() - pd.Timedelta(hours=24)
+        stations = list(features["pickup_location_id"].drop_duplicates().head(10))
+        columns = ["pickup_location_id", "pickup_hour", "target"]
+
+        start = time.perf_counter()
+        full = table.read()
+        expected = full.loc[(full["pickup_hour"] >= since) & full["pickup_location_id"].isin(stations), columns]
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pushed = table.read(columns=columns, filters=[("pickup_hour", ">=", since), ("pickup_location_id", "in", stations)])
+        push_time = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(
+            pushed.sort_values(columns, ignore_index=True), expected.sort_values(columns, ignore_index=True),
+        )
+        print(f"last 24h of {len(stations)} stations ({len(pushed):,} rows): full read + filter {full_time:.3f}s, "
+              f"pushdown {push_time:.3f}s, speedup {full_time / push_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""FlatForest vs LightGBM: exactness, single-row and batch latency, import cost.
+
+Trains an `LGBMRegressor` on synthetic lag features (station as a
+categorical split, like `train_lean`), exports it with
+`FlatForest.from_booster` and checks the predictions are bit-identical to
+`booster.predict` on float32 input. Latency is the best of several runs;
+import and load times are measured in fresh interpreters.
+
+Usage: python benchmarks/bench_flat_forest.py --trees 300 --stations 1000 --batch 100 3000
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+from bench_lag_features import synthetic_grid
+from src.features import make_lag_features_batched
+from src.flat_forest import FlatForest
+from src.predict import MODEL_COLUMNS, feature_matrix, latest_feature_rows
+from src.training import CATEGORICAL_FEATURES
+
+
+def best_time(fn, arg, repeats=7, number=1):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(arg)
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def fresh_interpreter_time(statement, repeats=5):
+    """Best wall time of `statement` in a new interpreter (startup excluded)."""
+    code = f"import sys, time; sys.path.insert(0, {str(ROOT)!r}); t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    return min(float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+               for _ in range(repeats))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--num-leaves", type=int, default=31)
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=24 * 7)
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 3000])
+    args = parser.parse_args()
+
+    train = make_lag_features_batched(synthetic_grid(args.stations, args.hours))
+    model = lgb.LGBMRegressor(n_estimators=args.trees, num_leaves=args.num_leaves, verbose=-1).fit(
+        train[MODEL_COLUMNS], train["target"], categorical_feature=CATEGORICAL_FEATURES,
+    )
+    booster = model.booster_
+    flat = FlatForest.from_booster(model)
+
+    X = feature_matrix(train)
+    np.testing.assert_array_equal(flat.predict(X), booster.predict(X))
+    print(f"trees={flat.num_trees()}  nodes={len(flat.feature)}  rows checked={len(X):,}  max abs diff 0.0")
+
+    # reg_sqrt models square their raw score; objective options FlatForest does not know are refused.
+    sqrt_booster = lgb.train({"objective": "regression", "reg_sqrt": True, "verbose": -1},
+                             lgb.Dataset(X, train["target"]), num_boost_round=50)
+    np.testing.assert_array_equal(FlatForest.from_booster(sqrt_booster).predict(X), sqrt_booster.predict(X))
+    dump = sqrt_booster.dump_model()
+    dump["objective"] = "regression unknown_option"
+    np.testing.assert_raises(ValueError, FlatForest.from_dump, dump)
+
+    latest = latest_feature_rows(train)
+    row_df = latest[MODEL_COLUMNS].head(1)
+    row = feature_matrix(row_df)
+    print("single row")
+    print(f"  LGBMRegressor.predict(DataFrame) {best_time(model.predict, row_df, number=200) * 1e6:8.1f} us")
+    print(f"  booster.predict(float32)         {best_time(booster.predict, row, number=200) * 1e6:8.1f} us")
+    print(f"  FlatForest.predict(DataFrame)    {best_time(flat.predict, row_df, number=200) * 1e6:8.1f} us")
+    print(f"  FlatForest.predict(float32)      {best_time(flat.predict, row, number=200) * 1e6:8.1f} us")
+
+    for n in args.batch:
+        batch = feature_matrix(train.head(n))
+        booster_time, flat_time = best_time(booster.predict, batch), best_time(flat.predict, batch)
+        print(f"batch {n:6d}  booster {booster_time * 1e3:8.2f} ms  flat {flat_time * 1e3:8.2f} ms"
+              f"  ({booster_time / flat_time:.2f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl_path, npz_path = Path(tmp) / "model.pkl", Path(tmp) / "model.npz"
+        joblib.dump(model, pkl_path)
+        flat.save(npz_path)
+        lightgbm_time = fresh_interpreter_time(f"import joblib, lightgbm; joblib.load({str(pkl_path)!r})")
+        flat_time = fresh_interpreter_time(f"from src.flat_forest import FlatForest; FlatForest.load({str(npz_path)!r})")
+    print("import + load in a fresh interpreter")
+    print(f"  lightgbm + joblib, unpickle LGBMRegressor {lightgbm_time * 1e3:8.1f} ms")
+    print(f"  src.flat_forest, FlatForest.load          {flat_time * 1e3:8.1f} ms  ({lightgbm_time / flat_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
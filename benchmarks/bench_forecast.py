@@ -0,0 +1,74 @@
+"""Throughput of the 24-hour forecast: per-station loop vs all stations rolled together.
+
+Usage: python benchmarks/bench_forecast.py --stations 100 1000 3000 --horizons 24
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from bench_lag_features import synthetic_grid
+from src.features import make_lag_features_batched
+from src.forecast import direct_forecast, next_hour_inputs, recursive_forecast, train_direct_models
+from src.predict import LAG_COLUMNS, MODEL_COLUMNS, latest_feature_rows
+
+
+def looped_forecast(model, X, horizons):
+    """The naive path: every station on its own, one predict call per hour, windows shifted in pandas."""
+    preds = np.empty((len(X), horizons), dtype=np.float32)
+    for i, row in enumerate(X):
+        window = pd.DataFrame([row], columns=MODEL_COLUMNS)
+        for h in range(horizons):
+            pred = max(model.predict(window.to_numpy(np.float32))[0], 0)
+            preds[i, h] = pred
+            lags = window[LAG_COLUMNS].to_numpy()[0]
+            window[LAG_COLUMNS] = [np.append(lags[1:], pred)]
+            hour = int(window.at[0, "hour_of_day"]) + 1
+            window.at[0, "day_of_week"] = (window.at[0, "day_of_week"] + hour // 24) % 7
+            window.at[0, "hour_of_day"] = hour % 24
+    return preds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--horizons", type=int, default=24)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--loop-limit", type=int, default=100, help="skip the looped path above this many stations")
+    args = parser.parse_args()
+
+    train = make_lag_features_batched(synthetic_grid(200, 24 * 14))
+    booster = lgb.LGBMRegressor(n_estimators=100, verbose=-1).fit(train[MODEL_COLUMNS], train["target"]).booster_
+    start = time.perf_counter()
+    direct = train_direct_models(train, args.horizons, num_boost_round=100)
+    print(f"trained {len(direct)} direct models in {time.perf_counter() - start:.1f}s")
+
+    for n_stations in args.stations:
+        latest = latest_feature_rows(make_lag_features_batched(synthetic_grid(n_stations, 48, seed=n_stations)))
+        X, _, _ = next_hour_inputs(latest)
+
+        start = time.perf_counter()
+        preds = recursive_forecast(booster, X, args.horizons, num_threads=args.threads)
+        batch_time = time.perf_counter() - start
+        line = f"stations={n_stations:6d}  recursive {batch_time:7.3f}s ({n_stations / batch_time:10,.0f} stations/s)"
+
+        start = time.perf_counter()
+        direct_forecast(direct, X, num_threads=args.threads)
+        line += f"  direct {time.perf_counter() - start:7.3f}s"
+
+        if n_stations <= args.loop_limit:
+            start = time.perf_counter()
+            expected = looped_forecast(booster, X, args.horizons)
+            loop_time = time.perf_counter() - start
+            np.testing.assert_allclose(preds, expected, rtol=1e-5, atol=1e-5)
+            line += f"  looped {loop_time:7.3f}s ({n_stations / loop_time:8,.0f} stations/s)  speedup {loop_time / batch_time:.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
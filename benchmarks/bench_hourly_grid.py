@@ -0,0 +1,97 @@
+"""Benchmark the MultiIndex merge grid against StationHourMatrix, alone and through the feature job's steps 5-7.
+
+Usage: python benchmarks/bench_hourly_grid.py --stations 2000 --hours 744
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.features import StationHourMatrix, make_lag_features_batched
+
+
+def merge_grid(hourly_counts):
+    """The original Step 5 of feature_engineering.py."""
+    full_hours = pd.date_range(hourly_counts['pickup_hour'].min(), hourly_counts['pickup_hour'].max(), freq='h')
+    all_locations = hourly_counts['pickup_location_id'].unique()
+    grid = pd.MultiIndex.from_product([full_hours, all_locations], names=['pickup_hour', 'pickup_location_id'])
+    grid_df = pd.DataFrame(index=grid).reset_index()
+
+    ts_df = pd.merge(grid_df, hourly_counts, on=["pickup_hour", "pickup_location_id"], how="left")
+    ts_df["rides"] = ts_df["rides"].fillna(0).astype(int)
+    return ts_df
+
+
+def grid_frame_steps(hourly_counts):
+    """Steps 5-7 through the long grid frame: grid rows, top 3 by groupby, lag rows of the last hour."""
+    ts_df = StationHourMatrix.from_counts(hourly_counts).to_frame()
+    top_locations = ts_df.groupby("pickup_location_id")["rides"].sum().sort_values(ascending=False).head(3).index.tolist()
+    features_df = make_lag_features_batched(ts_df, location_ids=top_locations)
+    return features_df.groupby("pickup_location_id", sort=False).tail(1).reset_index(drop=True)
+
+
+def matrix_steps(hourly_counts):
+    """Steps 5-7 as the feature job runs them: the matrix is kept throughout."""
+    matrix = StationHourMatrix.from_counts(hourly_counts)
+    features_df = matrix.lag_features(location_ids=matrix.top_stations(3))
+    return features_df.groupby("pickup_location_id", sort=False).tail(1).reset_index(drop=True)
+
+
+def sparse_counts(n_stations, n_hours, density, seed=42):
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2025-01-01", periods=n_hours, freq="h")
+    stations = rng.choice(10_000, size=n_stations, replace=False)
+    cells = rng.random((n_hours, n_stations)) < density
+    hour_idx, station_idx = np.nonzero(cells)
+    return pd.DataFrame({
+        "pickup_hour": hours[hour_idx],
+        "pickup_location_id": stations[station_idx],
+        "rides": rng.integers(1, 20, size=len(hour_idx)),
+    })
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--hours", type=int, default=744)
+    parser.add_argument("--density", type=float, default=0.3, help="share of non-zero station-hours")
+    args = parser.parse_args()
+
+    hourly_counts = sparse_counts(args.stations, args.hours, args.density)
+
+    merged, merge_time, merge_peak = measure(merge_grid, hourly_counts)
+    matrix, matrix_time, matrix_peak = measure(StationHourMatrix.from_counts, hourly_counts)
+
+    expected = merged.sort_values(["pickup_hour", "pickup_location_id"], ignore_index=True)
+    pd.testing.assert_frame_equal(matrix.to_frame(), expected, check_dtype=False)
+
+    print(f"stations={args.stations} hours={args.hours} non-zero rows={len(hourly_counts):,} grid rows={len(merged):,}")
+    print(f"MultiIndex merge:         {merge_time:8.3f}s  peak {merge_peak:8.1f} MB")
+    print(f"StationHourMatrix:        {matrix_time:8.3f}s  peak {matrix_peak:8.1f} MB")
+    print(f"speedup: {merge_time / matrix_time:.1f}x, memory: {merge_peak / matrix_peak:.1f}x less")
+
+    frame_features, frame_time, frame_peak = measure(grid_frame_steps, hourly_counts)
+    matrix_features, steps_time, steps_peak = measure(matrix_steps, hourly_counts)
+    pd.testing.assert_frame_equal(matrix_features, frame_features)
+    print(f"steps 5-7 via grid frame: {frame_time:8.3f}s  peak {frame_peak:8.1f} MB")
+    print(f"steps 5-7 via matrix:     {steps_time:8.3f}s  peak {steps_peak:8.1f} MB")
+    print(f"speedup: {frame_time / steps_time:.1f}x, memory: {frame_peak / steps_peak:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
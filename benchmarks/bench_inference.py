@@ -0,0 +1,65 @@
+"""Throughput of per-station inference vs the batched all-stations mode.
+
+Usage: python benchmarks/bench_inference.py --stations 100 1000 3000 --threads 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from bench_lag_features import synthetic_grid
+from src.features import make_lag_features_batched
+from src.predict import LAG_COLUMNS, MODEL_COLUMNS, feature_matrix, latest_feature_rows, predict_batched
+
+
+def looped_inference(model, features_df, locations):
+    """The per-location path of scripts/inference.py, for every station."""
+    rows = []
+    for loc in locations:
+        latest_row = features_df[features_df["pickup_location_id"] == loc].sort_values("pickup_hour").iloc[-1]
+        rows.append([latest_row[col] for col in LAG_COLUMNS] + [latest_row["hour_of_day"], latest_row["day_of_week"], loc])
+    return model.predict(pd.DataFrame(rows, columns=MODEL_COLUMNS))
+
+
+def batched_inference(model, features_df, batch_size, n_threads):
+    latest = latest_feature_rows(features_df)
+    return predict_batched(model, feature_matrix(latest), batch_size=batch_size, n_threads=n_threads)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--hours", type=int, default=96)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--loop-limit", type=int, default=1000, help="skip the looped path above this many stations")
+    args = parser.parse_args()
+
+    train = make_lag_features_batched(synthetic_grid(200, 24 * 14))
+    model = lgb.LGBMRegressor(n_estimators=100, verbose=-1).fit(train[MODEL_COLUMNS], train["target"])
+
+    for n_stations in args.stations:
+        features_df = make_lag_features_batched(synthetic_grid(n_stations, args.hours, seed=n_stations))
+
+        start = time.perf_counter()
+        preds = batched_inference(model, features_df, args.batch_size, args.threads)
+        batch_time = time.perf_counter() - start
+        line = f"stations={n_stations:6d}  batched {batch_time:7.3f}s ({n_stations / batch_time:10,.0f} stations/s)"
+
+        if n_stations <= args.loop_limit:
+            locations = np.sort(features_df["pickup_location_id"].unique())
+            start = time.perf_counter()
+            expected = looped_inference(model, features_df, locations)
+            loop_time = time.perf_counter() - start
+            np.testing.assert_allclose(preds, expected, rtol=1e-6)
+            line += f"  looped {loop_time:7.3f}s ({n_stations / loop_time:8,.0f} stations/s)  speedup {loop_time / batch_time:.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark make_lag_features (per-station loop) against make_lag_features_batched.
+
+Usage: python benchmarks/bench_lag_features.py --stations 2000 --hours 744
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.features import make_lag_features, make_lag_features_batched
+
+
+def synthetic_grid(n_stations, n_hours, seed=42):
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2025-01-01", periods=n_hours, freq="h")
+    stations = np.sort(rng.choice(10_000, size=n_stations, replace=False))
+    grid = pd.MultiIndex.from_product([hours, stations], names=["pickup_hour", "pickup_location_id"])
+    ts_df = pd.DataFrame(index=grid).reset_index()
+    ts_df["rides"] = rng.poisson(3, size=len(ts_df))
+    return ts_df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=500)
+    parser.add_argument("--hours", type=int, default=744)
+    parser.add_argument("--window-size", type=int, default=28)
+    args = parser.parse_args()
+
+    ts_df = synthetic_grid(args.stations, args.hours)
+    locations = ts_df["pickup_location_id"].unique()
+
+    start = time.perf_counter()
+    looped = []
+    for loc in locations:
+        features_df = make_lag_features(ts_df, loc, window_size=args.window_size)
+        features_df["pickup_location_id"] = loc
+        looped.append(features_df)
+    looped = pd.concat(looped, ignore_index=True)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = make_lag_features_batched(ts_df, window_size=args.window_size)
+    batch_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(
+        looped, batched[looped.columns], check_dtype=False
+    )
+
+    print(f"stations={args.stations} hours={args.hours} rows={len(batched):,}")
+    print(f"make_lag_features (loop):    {loop_time:8.3f}s  {looped.memory_usage(deep=True).sum() / 1e6:8.1f} MB")
+    print(f"make_lag_features_batched:   {batch_time:8.3f}s  {batched.memory_usage(deep=True).sum() / 1e6:8.1f} MB")
+    print(f"speedup: {loop_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
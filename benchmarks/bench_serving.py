@@ -0,0 +1,124 @@
+"""Request latency of the online prediction service (src/serving.py).
+
+Starts the service in a child process on a synthetic model and window store,
+then fires single-station requests from concurrent keep-alive clients.
+
+Usage: python benchmarks/bench_serving.py --stations 2000 --clients 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from bench_lag_features import synthetic_grid
+from src.features import make_lag_features_batched
+from src.predict import MODEL_COLUMNS, latest_feature_rows
+from src.serving import PredictionService, WindowStore
+
+
+async def request(reader, writer, method, path, body=b""):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    headers = {}
+    status = (await reader.readline()).split()[1]
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+    assert status == b"200", payload
+    return payload
+
+
+async def client(port, stations, n_requests, latencies, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for station in rng.choice(stations, size=n_requests):
+        start = time.perf_counter()
+        await request(reader, writer, "GET", f"/predict?station={station}")
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+def synthetic_service(n_stations, max_delay):
+    train = make_lag_features_batched(synthetic_grid(200, 24 * 14))
+    model = lgb.LGBMRegressor(n_estimators=100, verbose=-1).fit(train[MODEL_COLUMNS], train["target"])
+    windows = latest_feature_rows(make_lag_features_batched(synthetic_grid(n_stations, 48, seed=7)))
+    return model, windows, PredictionService(model, WindowStore.from_lag_rows(windows), max_delay=max_delay)
+
+
+def serve(args, conn):
+    async def start():
+        _, _, service = synthetic_service(args.stations, args.max_delay_ms / 1000)
+        server = await service.start(port=0)
+        conn.send(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(start())
+
+
+async def check(args):
+    """The served forecast is the model applied to the station's newest window."""
+    model, windows, service = synthetic_service(args.stations, args.max_delay_ms / 1000)
+    server = await service.start(port=0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+
+    row = windows.iloc[0]
+    X, _ = service.store.features([int(row["pickup_location_id"])])
+    served = await request(reader, writer, "GET", f"/predict?station={row['pickup_location_id']}")
+    assert abs(served["predicted_rides"] - model.predict(X)[0]) < 1e-3
+    assert np.array_equal(X[0, :27], row[[f"feature_{i}" for i in range(2, 29)]].to_numpy(np.float32))
+    bulk = await request(reader, writer, "GET", "/predict/bulk")
+    assert len(bulk) == len(windows)
+
+    next_hour = str(windows["pickup_hour"].max() + np.timedelta64(1, "h"))
+    push = [{"station": int(s), "hour": next_hour, "rides": 5} for s in windows["pickup_location_id"]]
+    start = time.perf_counter()
+    await request(reader, writer, "POST", "/push", json.dumps(push).encode())
+    print(f"bulk push of {len(push)} hourly counts {(time.perf_counter() - start) * 1000:.1f} ms")
+    X, _ = service.store.features([int(row["pickup_location_id"])])
+    assert X[0, 27] == 5 and X[0, 26] == row["target"]
+    writer.close()
+    server.close()
+    return np.array(service.store.station_ids)
+
+
+async def load(args, port, stations):
+    latencies = []
+    start = time.perf_counter()
+    rngs = [np.random.default_rng(i) for i in range(args.clients)]
+    await asyncio.gather(*(client(port, stations, args.requests, latencies, rng) for rng in rngs))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print(f"stations={args.stations}  clients={args.clients}  requests={len(ms)}  throughput {len(ms) / elapsed:,.0f} req/s")
+    print(f"latency p50 {np.percentile(ms, 50):.2f} ms  p95 {np.percentile(ms, 95):.2f} ms  "
+          f"p99 {np.percentile(ms, 99):.2f} ms  max {ms.max():.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stations = asyncio.run(check(args))
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(args, child), daemon=True)
+    server.start()
+    port = parent.recv()
+    try:
+        asyncio.run(load(args, port, stations))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
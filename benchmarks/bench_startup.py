@@ -0,0 +1,56 @@
+"""Cold-start cost of the pipeline entry points, from `python -X importtime`.
+
+Each command runs with `--help` in a fresh interpreter, so only what is
+imported before argument parsing is timed. Reports the summed cumulative
+time of the top-level imports, the slowest of them, and the wall time.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --commands "scripts/inference.py" "-m src infer"
+"""
+import argparse
+import re
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COMMANDS = ["-m src features", "-m src train", "-m src infer", "-m src backfill"]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(command):
+    """(wall seconds, {top-level module: cumulative seconds}) of `command --help`."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *shlex.split(command), "--help"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = int(match.group(2)) / 1e6
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", nargs="+", default=COMMANDS, help="interpreter arguments, e.g. \"-m src infer\"")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    for command in args.commands:
+        runs = [import_times(command) for _ in range(args.repeats)]
+        wall, modules = min(runs, key=lambda run: sum(run[1].values()))
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{command:32s} imports {sum(modules.values()) * 1e3:8.1f} ms  wall {wall * 1e3:8.1f} ms")
+        print("    " + ", ".join(f"{name} {seconds * 1e3:.0f} ms" for name, seconds in slowest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Offline benchmark suite covering every pipeline stage.
+
+Generates (and caches) a synthetic monthly trip archive, then times each
+stage and records its peak traced memory. Results are written as JSON and
+compared with a saved baseline; the run exits non-zero when a stage got
+slower than the tolerance allows.
+
+Usage:
+    python benchmarks/run_suite.py --trips 1000000 --stations 2000 --save-baseline
+    python benchmarks/run_suite.py --trips 1000000 --stations 2000   # compare
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from zipfile import ZipFile
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCH_DIR.parent))
+from bench_dashboard import original_rerun, synthetic_history
+from bench_hourly_grid import merge_grid
+from bench_inference import looped_inference
+from src.dashboard_view import DashboardView
+from src.features import StationHourMatrix, make_lag_features
+from src.ingest import TRIP_DTYPES, clean_trips, hourly_counts_from_zip, trip_csv_members
+from src.predict import MODEL_COLUMNS, feature_matrix, latest_feature_rows, predict_batched
+from src.stations import StationCatalog
+from synthetic import write_month_zip
+
+CACHE_DIR = BENCH_DIR / ".cache"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def measure(fn, *args, trace_memory=True):
+    """Wall time of one call, then peak traced memory of a second (traced) call."""
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        fn(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, {"seconds": round(seconds, 4), "peak_mb": None if peak_mb is None else round(peak_mb, 1)}
+
+
+def ingest_in_memory(zip_path, stations):
+    """The original Steps 2-4: whole CSV in memory, then clean and aggregate."""
+    with ZipFile(zip_path) as zf:
+        frames = []
+        for name in trip_csv_members(zf):
+            with zf.open(name) as file:
+                frames.append(pd.read_csv(file, dtype=TRIP_DTYPES, low_memory=False))
+    df = clean_trips(pd.concat(frames, ignore_index=True), stations)
+    return df.groupby(['pickup_hour', 'pickup_location_id']).size().reset_index(name="rides")
+
+
+def lag_loop(ts_df, locations):
+    return [make_lag_features(ts_df, loc) for loc in locations]
+
+
+def run(args):
+    zip_path = CACHE_DIR / f"trips_{args.trips}_{args.stations}_{args.seed}.zip"
+    if not zip_path.exists():
+        print(f"🛠️ Generating {args.trips:,} trips over {args.stations} stations")
+        write_month_zip(zip_path, args.trips, args.stations, seed=args.seed)
+
+    trace = not args.no_memory
+    stages = {}
+
+    def stage(name, fn, *fn_args, rows=None):
+        result, stats = measure(fn, *fn_args, trace_memory=trace)
+        stats["rows"] = rows if rows is not None else (len(result) if hasattr(result, "__len__") else None)
+        stages[name] = stats
+        print(f"{name:24s} {stats['seconds']:9.3f}s  peak {stats['peak_mb'] or 0:9.1f} MB")
+        return result
+
+    # In memory only, so benchmark stations never reach the real catalog.
+    stations = StationCatalog(path=None)
+    stage("ingest_in_memory", ingest_in_memory, zip_path, stations)
+    hourly_counts = stage("ingest_streaming", lambda: hourly_counts_from_zip(zip_path, stations=stations))
+    ts_df = stage("grid_merge", merge_grid, hourly_counts)
+    matrix = stage("grid_matrix", StationHourMatrix.from_counts, hourly_counts, rows=len(ts_df))
+
+    locations = matrix.station_ids[:args.loop_stations]
+    stage("lag_loop", lag_loop, ts_df, locations, rows=len(locations))
+    features_df = stage("lag_batched", matrix.lag_features)
+
+    train = features_df.sample(min(len(features_df), 200_000), random_state=args.seed)
+    model = lgb.LGBMRegressor(n_estimators=100, verbose=-1).fit(train[MODEL_COLUMNS], train["target"])
+    latest = latest_feature_rows(features_df)
+    stage("predict_loop", looped_inference, model, features_df, locations)
+    stage("predict_batched", lambda: predict_batched(model, feature_matrix(latest)), rows=len(latest))
+
+    history = synthetic_history(len(matrix.station_ids), args.history_hours, seed=args.seed)
+    location = history["location_id"].iloc[0]
+    stage("dashboard_original", original_rerun, history, location, 24, rows=len(history))
+    view = stage("dashboard_view_build", DashboardView, history, rows=len(history))
+    stage("dashboard_view_rerun", view.trend, location, 24)
+
+    return {
+        "params": {"trips": args.trips, "stations": args.stations, "seed": args.seed,
+                   "loop_stations": args.loop_stations, "history_hours": args.history_hours},
+        "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                        "pandas": pd.__version__, "numpy": np.__version__, "lightgbm": lgb.__version__},
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, tolerance, min_seconds=0.05):
+    """Stages that got slower than `tolerance` (relative) and `min_seconds` (absolute)."""
+    if baseline["params"] != results["params"]:
+        print("⚠️ Baseline was recorded with different parameters; comparing anyway")
+    regressions = []
+    for name, stats in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        ratio = stats["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        slower = stats["seconds"] - base["seconds"]
+        flag = ratio > 1 + tolerance and slower > min_seconds
+        print(f"{'❌' if flag else '✅'} {name:24s} {base['seconds']:9.3f}s -> {stats['seconds']:9.3f}s ({ratio:5.2f}x)")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for every pipeline stage")
+    parser.add_argument("--trips", type=int, default=100_000)
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--loop-stations", type=int, default=50, help="stations timed in the per-station loops")
+    parser.add_argument("--history-hours", type=int, default=720, help="hours of synthetic dashboard history")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced second run of each stage")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "latest.json")
+    parser.add_argument("--baseline", type=Path, default=BENCH_DIR / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"📌 Baseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"❌ Slower than baseline: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print("ℹ️ No baseline yet; run with --save-baseline to record one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Seeded generator of Citi Bike-style monthly trip archives.
+
+Writes a ZIP with the real trip schema, split into CSV parts of at most
+`part_rows` trips like the published archives, with messy station ids
+("6140.05", "5329", "HB101", blanks) and a share of bad rows (missing or
+unparseable times, negative and over-5-hour durations). Trips are produced
+in chunks, so 10^7 trips never have to fit in memory at once.
+
+Usage: python benchmarks/synthetic.py --trips 1000000 --stations 2000 --out data/raw/synthetic.zip
+"""
+import argparse
+import io
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import numpy as np
+import pandas as pd
+
+TRIP_SCHEMA = [
+    "ride_id", "rideable_type", "started_at", "ended_at",
+    "start_station_name", "start_station_id", "end_station_name", "end_station_id",
+    "start_lat", "start_lng", "end_lat", "end_lng", "member_casual",
+]
+
+# Share of pickups per hour of day: quiet nights, commuter peaks at 8h and 17-18h.
+HOURLY_PROFILE = np.array([
+    1, 0.6, 0.4, 0.3, 0.3, 0.8, 2, 4.5, 6.5, 4.5, 3.5, 4, 4.5, 4.5, 4.5, 5, 6.5, 8, 7, 5, 3.5, 2.8, 2.2, 1.5,
+])
+
+
+def station_catalog(n_stations, rng):
+    """Station ids in the formats found in the archives, with Zipf-like popularity."""
+    kinds = rng.choice(["decimal", "integer", "jersey"], size=n_stations, p=[0.8, 0.15, 0.05])
+    base = rng.choice(np.arange(2000, 9000), size=n_stations, replace=False)
+    ids = np.where(
+        kinds == "decimal", [f"{b}.{rng.integers(1, 20):02}" for b in base],
+        np.where(kinds == "integer", base.astype(str), [f"HB{b % 1000:03}" for b in base]),
+    )
+    popularity = 1 / np.arange(1, n_stations + 1) ** 0.8
+    popularity = rng.permutation(popularity / popularity.sum())
+    return pd.DataFrame({
+        "station_id": ids,
+        "name": [f"Station {i}" for i in range(n_stations)],
+        "lat": rng.uniform(40.65, 40.85, n_stations).round(6),
+        "lng": rng.uniform(-74.05, -73.90, n_stations).round(6),
+        "weight": popularity,
+    })
+
+
+def _timestamps(values):
+    """Format as the archives do ("2025-01-01 00:00:55.994"), vectorized."""
+    return pd.Series(np.datetime_as_string(values.to_numpy(), unit="ms")).str.replace("T", " ", regex=False)
+
+
+def trip_chunk(n, year, month, stations, rng, bad_row_rate=0.02):
+    start = pd.Timestamp(year=year, month=month, day=1)
+    days = start.days_in_month
+    hour_p = HOURLY_PROFILE / HOURLY_PROFILE.sum()
+    offsets = (
+        rng.integers(0, days, n) * 86_400_000
+        + rng.choice(24, size=n, p=hour_p) * 3_600_000
+        + rng.integers(0, 3_600_000, n)
+    )
+    started = start + pd.to_timedelta(np.sort(offsets), unit="ms")
+    duration_ms = np.exp(rng.normal(np.log(12 * 60_000), 0.7, n)).astype(np.int64)
+    ended = started + pd.to_timedelta(duration_ms, unit="ms")
+
+    start_idx = rng.choice(len(stations), size=n, p=stations["weight"].to_numpy())
+    end_idx = rng.choice(len(stations), size=n, p=stations["weight"].to_numpy())
+    df = pd.DataFrame({
+        "ride_id": np.frombuffer(rng.bytes(8 * n).hex().upper().encode(), dtype="S16").astype(str),
+        "rideable_type": rng.choice(["classic_bike", "electric_bike"], n),
+        "started_at": _timestamps(started),
+        "ended_at": _timestamps(ended),
+        "start_station_name": stations["name"].to_numpy()[start_idx],
+        "start_station_id": stations["station_id"].to_numpy()[start_idx],
+        "end_station_name": stations["name"].to_numpy()[end_idx],
+        "end_station_id": stations["station_id"].to_numpy()[end_idx],
+        "start_lat": stations["lat"].to_numpy()[start_idx],
+        "start_lng": stations["lng"].to_numpy()[start_idx],
+        "end_lat": stations["lat"].to_numpy()[end_idx],
+        "end_lng": stations["lng"].to_numpy()[end_idx],
+        "member_casual": rng.choice(["member", "casual"], n, p=[0.8, 0.2]),
+    })
+
+    # Bad rows, spread evenly over the kinds the cleaning step has to handle.
+    bad = np.flatnonzero(rng.random(n) < bad_row_rate)
+    kind = rng.integers(0, 5, len(bad))
+    df.loc[bad[kind == 0], "started_at"] = np.nan
+    df.loc[bad[kind == 1], "ended_at"] = "not a timestamp"
+    df.loc[bad[kind == 2], "ended_at"] = df.loc[bad[kind == 2], "started_at"].str[:11] + "00:00:00.000"
+    df.loc[bad[kind == 3], "ended_at"] = _timestamps(started[bad[kind == 3]] + pd.Timedelta(hours=6)).to_numpy()
+    df.loc[bad[kind == 4], "start_station_id"] = np.nan
+    return df
+
+
+def write_month_zip(path, n_trips, n_stations, year=2025, month=1, seed=42,
+                    part_rows=1_000_000, chunk_rows=250_000, bad_row_rate=0.02):
+    """Write one synthetic monthly archive and return its path."""
+    rng = np.random.default_rng(seed)
+    stations = station_catalog(n_stations, rng)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with ZipFile(path, "w", compression=ZIP_DEFLATED, compresslevel=1) as zf:
+        written, part = 0, 1
+        while written < n_trips:
+            part_size = min(part_rows, n_trips - written)
+            name = f"{year}{month:02}-citibike-tripdata_{part}.csv"
+            with zf.open(name, "w", force_zip64=True) as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                for offset in range(0, part_size, chunk_rows):
+                    n = min(chunk_rows, part_size - offset)
+                    chunk = trip_chunk(n, year, month, stations, rng, bad_row_rate)
+                    chunk.to_csv(f, index=False, header=offset == 0)
+            written += part_size
+            part += 1
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=100_000)
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--month", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args()
+    path = write_month_zip(args.out, args.trips, args.stations, args.year, args.month, args.seed)
+    print(f"✅ Wrote {args.trips:,} trips over {args.stations} stations to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# Kept for existing jobs; same as `python -m src backfill`.
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.cli import main
+
+if __name__ == "__main__":
+    main(["backfill", *sys.argv[1:]])
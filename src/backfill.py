@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.data_cache import has_cached_grid, load_hourly_matrix, month_key
+from src.ingest import download_month_zip
+
+
+def month_range(start, end):
+    """Every (year, month) from `start` to `end` inclusive, both given as "YYYY-MM"."""
+    year, month = map(int, start.split("-"))
+    end_year, end_month = map(int, end.split("-"))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def process_month(year, month, chunksize=500_000):
+    """Download, clean and aggregate one month into the Parquet cache.
+
+    Runs in a worker process. Returns (key, skipped).
+    """
+    key = month_key(year, month)
+    if has_cached_grid(key):
+        return key, True
+    zip_path = download_month_zip(year, month)
+    load_hourly_matrix(key, zip_path, chunksize=chunksize)
+    return key, False
+
+
+def backfill(start, end, workers=None, chunksize=500_000):
+    """Cache every month in the range in parallel; months already cached are skipped.
+
+    Each month is independent until the final merge, so wall-clock time scales
+    with months / workers. Returns the month keys in order.
+    """
+    months = month_range(start, end)
+    workers = min(workers or os.cpu_count(), len(months))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_month, year, month, chunksize) for year, month in months]
+        for future in futures:
+            key, skipped = future.result()
+            print(f"{'⏭️' if skipped else '✅'} {key}{' already cached' if skipped else ' processed'}")
+    return [month_key(year, month) for year, month in months]
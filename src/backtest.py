@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from src.predict import MODEL_COLUMNS
+from src.training import CATEGORICAL_FEATURES, DEFAULT_PARAMS, training_matrix
+
+HOUR = np.timedelta64(1, "h")
+
+
+def rolling_origins(times, n_folds=12, horizon_hours=24 * 30, step_hours=None, window_hours=None,
+                    min_train_hours=24 * 7):
+    """Forecast origins replayed backwards from the newest hour.
+
+    Fold k trains on the hours before its origin (all of them, or the last
+    `window_hours` for a sliding window) and is scored on the next
+    `horizon_hours`. `times` must be sorted; folds are returned oldest first
+    as dicts of row ranges into it.
+    """
+    step_hours = step_hours or horizon_hours
+    first, end = times[0], times[-1] + HOUR
+    folds = []
+    for k in range(n_folds):
+        origin = end - (k * step_hours + horizon_hours) * HOUR
+        if origin - first < min_train_hours * HOUR:
+            break
+        train_start = first if window_hours is None else max(first, origin - window_hours * HOUR)
+        train_lo, train_hi, test_hi = np.searchsorted(times, [train_start, origin, origin + horizon_hours * HOUR])
+        folds.append({
+            "origin": pd.Timestamp(origin),
+            "train": (int(train_lo), int(train_hi)),
+            "test": (int(train_hi), int(test_hi)),
+        })
+    return [dict(fold, fold=i) for i, fold in enumerate(reversed(folds))]
+
+
+def _error_table(keys, errors, name):
+    """MAE, RMSE and row count of `errors` grouped by integer `keys`, via bincount."""
+    codes, labels = pd.factorize(keys, sort=True)
+    n = np.bincount(codes)
+    table = pd.DataFrame({
+        "mae": np.bincount(codes, weights=np.abs(errors)) / n,
+        "rmse": np.sqrt(np.bincount(codes, weights=errors.astype(np.float64) ** 2) / n),
+        "rows": n,
+    }, index=pd.Index(labels, name=name))
+    return table
+
+
+def backtest(df, n_folds=12, horizon_hours=24 * 30, step_hours=None, window_hours=None, params=None,
+             num_boost_round=300, workers=None, columns=MODEL_COLUMNS):
+    """Rolling-origin backtest of the LightGBM model over the hourly history.
+
+    The rows are packed and binned once into a single LightGBM Dataset; every
+    fold trains on a row subset of it (built when the fold starts, sharing its
+    bin mappers) and predicts on a view of the float32 matrix, so nothing is
+    re-binned or copied per fold. Folds run in `workers` threads with the
+    cores split between them.
+
+    Returns (predictions, metrics): the out-of-sample predictions of every
+    fold, and MAE/RMSE tables by "fold", "station" and "hour_of_day" plus an
+    "overall" summary.
+    """
+    workers = workers or min(n_folds, os.cpu_count())
+    num_threads = max(1, os.cpu_count() // workers)
+    params = {**DEFAULT_PARAMS, **(params or {}), "num_threads": num_threads}
+
+    start = time.perf_counter()
+    X, y, times = training_matrix(df, columns)
+    folds = rolling_origins(times, n_folds, horizon_hours, step_hours, window_hours)
+    if not folds:
+        raise ValueError("Not enough history for a single backtest fold")
+
+    categorical = [columns.index(col) for col in CATEGORICAL_FEATURES]
+    full_set = lgb.Dataset(
+        X, label=y, feature_name=columns, categorical_feature=categorical, params=params, free_raw_data=True,
+    ).construct()
+    prepare_seconds = time.perf_counter() - start
+    # Each fold builds its own subset, so at most `workers` of them are alive at once;
+    # constructing them concurrently is not thread-safe.
+    subset_lock = threading.Lock()
+
+    def run_fold(i):
+        fold_start = time.perf_counter()
+        with subset_lock:
+            train_set = full_set.subset(np.arange(*folds[i]["train"], dtype=np.int32)).construct()
+        booster = lgb.train(params, train_set, num_boost_round=num_boost_round)
+        del train_set
+        lo, hi = folds[i]["test"]
+        pred = booster.predict(X[lo:hi], num_threads=num_threads)
+        return pred, time.perf_counter() - fold_start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_fold, range(len(folds))))
+    fit_seconds = time.perf_counter() - start
+
+    test_rows = np.concatenate([np.arange(*fold["test"]) for fold in folds])
+    predictions = pd.DataFrame({
+        "fold": np.repeat([fold["fold"] for fold in folds], [fold["test"][1] - fold["test"][0] for fold in folds]),
+        "pickup_hour": times[test_rows],
+        "pickup_location_id": X[test_rows, columns.index("pickup_location_id")].astype(np.int64),
+        "hour_of_day": X[test_rows, columns.index("hour_of_day")].astype(np.int64),
+        "target": y[test_rows],
+        "prediction": np.concatenate([pred for pred, _ in results]).astype(np.float32),
+    })
+
+    errors = (predictions["prediction"] - predictions["target"]).to_numpy()
+    by_fold = _error_table(predictions["fold"].to_numpy(), errors, "fold")
+    by_fold["origin"] = [fold["origin"] for fold in folds]
+    by_fold["train_rows"] = [fold["train"][1] - fold["train"][0] for fold in folds]
+    by_fold["seconds"] = [round(seconds, 3) for _, seconds in results]
+    metrics = {
+        "overall": {
+            "mae": float(np.mean(np.abs(errors))),
+            "rmse": float(np.sqrt(np.mean(errors.astype(np.float64) ** 2))),
+            "folds": len(folds),
+            "rows": len(errors),
+            "prepare_seconds": round(prepare_seconds, 3),
+            "fit_seconds": round(fit_seconds, 3),
+        },
+        "fold": by_fold,
+        "station": _error_table(predictions["pickup_location_id"].to_numpy(), errors, "pickup_location_id"),
+        "hour_of_day": _error_table(predictions["hour_of_day"].to_numpy(), errors, "hour_of_day"),
+    }
+    return predictions, metrics
+
+
+def save_metrics(metrics, out_dir):
+    """Write the backtest tables as CSV files and the summary as JSON under `out_dir`."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("fold", "station", "hour_of_day"):
+        metrics[name].to_csv(out_dir / f"backtest_by_{name}.csv")
+    (out_dir / "backtest_overall.json").write_text(json.dumps(metrics["overall"], indent=2))
+    return out_dir
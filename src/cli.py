@@ -0,0 +1,34 @@
+"""One entry point for the pipeline: `python -m src <command> [options]`.
+
+Only argparse and the option modules are imported up front; each command
+imports its heavy dependencies inside `run`, so `--help` stays fast.
+"""
+import argparse
+from importlib import import_module
+
+COMMANDS = {
+    "features": "src.commands.features",
+    "train": "src.commands.train",
+    "infer": "src.commands.infer",
+    "backfill": "src.commands.backfill",
+    "serve": "src.commands.serve",
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src", description="Citi Bike demand pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for name, module_name in COMMANDS.items():
+        module = import_module(module_name)
+        subparser = subparsers.add_parser(name, help=module.HELP, description=module.HELP)
+        module.add_arguments(subparser)
+        subparser.set_defaults(run=module.run)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if hasattr(args, "store"):
+        from src import config
+        args.store = args.store or config.FEATURE_STORE
+    args.run(args)
@@ -0,0 +1,6 @@
+"""Subcommands of `python -m src`.
+
+Each module exposes `HELP`, `add_arguments(parser)` and `run(args)`. Module level stays light
+(argparse options only); pandas, LightGBM and the feature store are imported inside `run`, so
+`--help` and argument errors return without loading them.
+"""
@@ -0,0 +1,46 @@
+from src.options import add_store_args
+
+HELP = "Backfill hourly grids and lag features for a range of months"
+
+HOPSWORKS_PROJECT = "BhumikaTaxiFareMLProject"
+
+
+def add_arguments(parser):
+    parser.add_argument("--start", required=True, metavar="YYYY-MM", help="first month of the range")
+    parser.add_argument("--end", required=True, metavar="YYYY-MM", help="last month of the range (inclusive)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="trips per chunk when parsing a month")
+    add_store_args(parser)
+
+
+def run(args):
+    import time
+
+    from src import config
+    from src.backfill import backfill
+    from src.config import TRANSFORMED_DATA_DIR
+    from src.data_cache import lag_features_from_cache
+    from src.feature_store import connect
+    from src.stations import publish_catalog, pull_catalog
+
+    # --- Station codes continue from the catalog published to the feature store ---
+    store = connect(args.store, config.HOPSWORKS_API_KEY, HOPSWORKS_PROJECT, root=args.store_dir)
+    stations = pull_catalog(store)
+
+    # --- Step 1: Download, parse and aggregate every month in parallel ---
+    start_time = time.perf_counter()
+    keys = backfill(args.start, args.end, workers=args.workers, chunksize=args.chunksize)
+    publish_catalog(store, stations)
+    store.flush()
+
+    # --- Step 2: Merge into one continuous grid and build lag features across month boundaries ---
+    features_df = lag_features_from_cache(keys)
+    print(f"📊 Built {len(features_df)} lag rows for {features_df['pickup_location_id'].nunique()} stations "
+          f"in {time.perf_counter() - start_time:.1f}s")
+
+    # --- Step 3: Save lag features for training ---
+    output_path = TRANSFORMED_DATA_DIR / "backfill" / f"lag_features_{args.start}_{args.end}.parquet"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    features_df.to_parquet(output_path, index=False)
+    print(f"💾 Lag features saved at: {output_path}")
+    print(f"👉 Train on this range with: python -m src train --months {' '.join(keys)}")
@@ -0,0 +1,212 @@
+from pathlib import Path
+
+from src.instrumentation import add_instrumentation_args
+from src.options import DEFAULT_ENGINE, TRIP_ENGINES, add_store_args
+
+HELP = "Build hourly lag features and upload them to the feature store"
+
+HOPSWORKS_PROJECT = "BhumikaTaxiFareMLProject"
+FG_NAME = "citibike_hourly_features"
+FG_VERSION = 2
+
+
+def add_arguments(parser):
+    parser.add_argument("--streaming", action="store_true",
+                        help="spool the ZIP to disk and clean the trips chunk by chunk into the local Parquet cache")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="trips per chunk in streaming mode")
+    parser.add_argument("--zip-path", type=Path, default=None,
+                        help="read trips from a local ZIP instead of downloading the month")
+    parser.add_argument("--month", default=None, metavar="YYYY-MM",
+                        help="month to build (default: the previous month); with --zip-path, the month the "
+                             "archive is cached under (without it, a --zip-path grid is not cached)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="apply only trips newer than the saved watermark to the local feature state")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="drop the local feature state and rebuild it from scratch (implies --incremental)")
+    parser.add_argument("--verify", action="store_true",
+                        help="in incremental mode, check the state against a full recompute")
+    parser.add_argument("--all-stations", action="store_true",
+                        help="upload every station's latest window instead of the top 3 stations'")
+    parser.add_argument("--engine", choices=sorted(TRIP_ENGINES), default=DEFAULT_ENGINE,
+                        help="trip cleaning engine; arrow parses and filters the raw columns before building a DataFrame")
+    add_store_args(parser)
+    add_instrumentation_args(parser)
+
+
+def run(args):
+    from datetime import datetime
+
+    import numpy as np
+    import pandas as pd
+
+    from src import config
+    from src.feature_store import connect
+    from src.instrumentation import RunReport, frame_bytes
+    from src.stations import publish_catalog, pull_catalog
+
+    report = RunReport.from_args("feature_engineering", args)
+
+    # --- Connect first: station codes continue from the catalog published to the feature store ---
+    with report.stage("store_connect"):
+        store = connect(args.store, config.HOPSWORKS_API_KEY, HOPSWORKS_PROJECT, root=args.store_dir)
+        stations = pull_catalog(store)
+    print(f"🚉 {len(stations)} stations in the catalog")
+
+    # --- Step 1: Get previous full month's info (or the --month asked for) ---
+    if args.month:
+        year, month = map(int, args.month.split("-"))
+    else:
+        today = datetime.today()
+        year = today.year
+        month = today.month - 1 if today.month > 1 else 12
+        if today.month == 1:
+            year -= 1
+
+    if args.incremental or args.full_rebuild:
+        final_features = _incremental_features(args, report, year, month)
+    else:
+        final_features = _month_features(args, report, year, month)
+
+    # --- Step 8: Add hourly timestamps for Hopsworks ---
+    # ✅ Assign current hour to each prediction row (1 row per location)
+    current_hour = pd.Timestamp.utcnow().floor("h")
+    final_features["pickup_hour"] = [current_hour] * len(final_features)
+
+    # --- Step 9: Upload to the feature store ---
+    fg = store.table(
+        FG_NAME,
+        version=FG_VERSION,
+        description="28-hour lag features for hourly Citi Bike predictions",
+        primary_key=["pickup_location_id", "pickup_hour"],
+        event_time="pickup_hour",
+    )
+
+    # Fix types
+    int_cols = [col for col in final_features.columns if col.startswith("feature_")] + ["target", "pickup_location_id"]
+    final_features[int_cols] = final_features[int_cols].astype(np.int32)
+
+    # --- Bulk insert in the background; flush only waits for the upload, not materialization ---
+    with report.stage("insert", rows=len(final_features), bytes=frame_bytes(final_features)):
+        fg.insert(final_features)
+        # The catalog goes with the features: it is what their pickup_location_id codes mean.
+        publish_catalog(store, stations)
+        store.flush()
+    print(f"✅ Features uploaded to the {args.store} feature store successfully.")
+    report.write()
+
+
+def _incremental_features(args, report, year, month):
+    """Steps 2-7 (incremental): apply only new trips to the local feature state."""
+    from src.incremental import local_source, month_source, reset_state, top_stations, update_state, verify_state
+
+    with report.stage("incremental_update") as stage:
+        if args.full_rebuild:
+            reset_state()
+        source = local_source(args.zip_path) if args.zip_path is not None else month_source(year, month)
+        hourly_counts, windows = update_state(source, chunksize=args.chunksize)
+        stage.rows = len(hourly_counts)
+    if args.verify:
+        with report.stage("verify_full_recompute"):
+            verify_state(chunksize=args.chunksize)
+
+    if args.all_stations:
+        return windows
+    top_locations = top_stations(hourly_counts, 3)
+    final_features = windows.set_index("pickup_location_id").loc[top_locations].reset_index()
+    return final_features[windows.columns]
+
+
+def _month_features(args, report, year, month):
+    """Steps 2-7: grid the whole month, then the latest lag row of the top 3 stations (or of all of them)."""
+    from src.data_cache import has_cached_grid, load_hourly_matrix, month_key
+    from src.features import StationHourMatrix
+    from src.ingest import download_month_zip, hourly_counts_from_zip
+    from src.stations import default_catalog
+
+    # Steps 5-7 keep the station x hour matrix; the zero-filled grid is only built as rows for the Parquet cache.
+    if args.zip_path is not None and args.month is None:
+        # --- Step 2-5 (local ZIP of unknown month): stream it into a grid without touching the month cache ---
+        with report.stage("clean_and_grid") as stage:
+            stations = default_catalog()
+            matrix = StationHourMatrix.from_counts(
+                hourly_counts_from_zip(args.zip_path, chunksize=args.chunksize, engine=args.engine, stations=stations)
+            )
+            stations.save()
+            stage.rows = matrix.values.size
+    elif args.streaming or args.zip_path is not None:
+        # --- Step 2-5 (streaming): Spool ZIP to disk, clean chunk by chunk into the Parquet cache ---
+        key = month_key(year, month)
+        if args.zip_path is None and has_cached_grid(key):
+            with report.stage("load_cached_grid") as stage:
+                matrix = load_hourly_matrix(key)
+                stage.rows = matrix.values.size
+        else:
+            with report.stage("download") as stage:
+                zip_path = args.zip_path or download_month_zip(year, month)
+                stage.bytes = Path(zip_path).stat().st_size
+            with report.stage("clean_and_grid") as stage:
+                matrix = load_hourly_matrix(key, zip_path, chunksize=args.chunksize)
+                stage.rows = matrix.values.size
+    else:
+        matrix = _download_and_grid(args, report, year, month)
+
+    # --- Step 6 + 7: Get top 3 locations (or every one, with --all-stations) and prepare lag features ---
+    with report.stage("lag_features") as stage:
+        top_locations = None if args.all_stations else matrix.top_stations(3)
+
+        features_df = matrix.lag_features(location_ids=top_locations)
+        final_features = features_df.groupby("pickup_location_id", sort=False).tail(1).reset_index(drop=True)  # <-- get the last row
+        stage.rows = len(features_df)
+    return final_features
+
+
+def _download_and_grid(args, report, year, month):
+    """Steps 2-5 in memory: download the month, clean it and build the hourly station x hour matrix."""
+    from io import BytesIO
+    from zipfile import ZipFile
+
+    import pandas as pd
+    import requests
+
+    from src.features import StationHourMatrix
+    from src.instrumentation import frame_bytes
+    from src.ingest import TRIPDATA_URL, TRIP_DTYPES, clean_trips, clean_trips_arrow, read_trip_table, trip_csv_members
+    from src.stations import default_catalog
+
+    # --- Step 2: Download monthly data ZIP ---
+    with report.stage("download") as stage:
+        url = TRIPDATA_URL.format(year=year, month=month)
+        response = requests.get(url)
+
+        if response.status_code != 200:
+            raise Exception(f"❌ Failed to download {url}")
+        stage.bytes = len(response.content)
+
+    with report.stage("read_csv") as stage:
+        with ZipFile(BytesIO(response.content)) as zf:
+            csv_filename = trip_csv_members(zf)[0]
+            with zf.open(csv_filename) as file:
+                if args.engine == "arrow":
+                    trips = read_trip_table(file)
+                    stage.rows, stage.bytes = trips.num_rows, trips.nbytes
+                else:
+                    df = pd.read_csv(file, dtype=TRIP_DTYPES, low_memory=False)
+                    stage.rows, stage.bytes = len(df), frame_bytes(df)
+
+    # --- Step 3: Clean + Prepare ---
+    with report.stage("clean") as stage:
+        stations = default_catalog()
+        df = clean_trips_arrow(trips, stations) if args.engine == "arrow" else clean_trips(df, stations)
+        stations.save()
+        stage.rows = len(df)
+
+    # --- Step 4: Round to hourly and aggregate ---
+    with report.stage("aggregate") as stage:
+        hourly_counts = df.groupby(['pickup_hour', 'pickup_location_id']).size().reset_index(name="rides")
+        stage.rows = len(hourly_counts)
+
+    # --- Step 5: Build complete hourly grid for missing hours ---
+    with report.stage("grid") as stage:
+        matrix = StationHourMatrix.from_counts(hourly_counts)
+        stage.rows = matrix.values.size
+    return matrix
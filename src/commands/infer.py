@@ -0,0 +1,179 @@
+from pathlib import Path
+
+from src.instrumentation import add_instrumentation_args
+from src.options import add_store_args
+
+HELP = "Predict next-hour rides and upload them to the feature store"
+
+HOPSWORKS_PROJECT = "BhumikaTaxiFareMLProject"
+FG_NAME = "citibike_hourly_features"
+FG_VERSION = 2
+MODEL_NAME = "citibike_lightgbm_full"
+WINDOW_SIZE = 28
+PRED_FG_NAME = "citibike_hourly_predictions"
+PRED_FG_VERSION = 2
+FORECAST_FG_NAME = "citibike_hourly_forecasts"
+FORECAST_FG_VERSION = 2
+# Stations the features job uploads without --all-stations.
+TOP_STATIONS = 3
+
+
+def add_arguments(parser):
+    parser.add_argument("--all-stations", action="store_true",
+                        help="forecast every station instead of the top 3, in batched float32 passes")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="rows per predict call in --all-stations mode")
+    parser.add_argument("--threads", type=int, default=1, help="threads used for scoring in --all-stations mode")
+    parser.add_argument("--horizons", type=int, default=1,
+                        help="also forecast this many hours ahead for every station and upload them as a forecast table")
+    parser.add_argument("--direct-models", type=Path, default=None,
+                        help="directory of per-horizon boosters from train --direct-horizons (default: recursive)")
+    parser.add_argument("--lookback-hours", type=int, default=7 * 24,
+                        help="only read feature rows this recent (0 reads the whole feature group)")
+    add_store_args(parser)
+    add_instrumentation_args(parser)
+
+
+def run(args):
+    from importlib.util import find_spec
+
+    import numpy as np
+    import pandas as pd
+
+    from src import config
+    from src.feature_store import connect
+    from src.instrumentation import RunReport, frame_bytes
+    from src.model_cache import ModelCache
+    from src.predict import MODEL_COLUMNS, feature_matrix, latest_feature_rows, predict_batched
+    from src.stations import published_catalog
+
+    report = RunReport.from_args("inference", args)
+
+    # --- Connect to the feature store ---
+    with report.stage("store_connect"):
+        store = connect(args.store, config.HOPSWORKS_API_KEY, HOPSWORKS_PROJECT, root=args.store_dir)
+
+    # --- Load recent features only: the model columns of the last --lookback-hours ---
+    with report.stage("read_features") as stage:
+        filters = None
+        if args.lookback_hours:
+            filters = [("pickup_hour", ">=", pd.Timestamp.utcnow().floor("h") - pd.Timedelta(hours=args.lookback_hours))]
+        features_df = store.table(FG_NAME, version=FG_VERSION).read(
+            columns=MODEL_COLUMNS + ["target", "pickup_hour"], filters=filters,
+        )
+        stage.rows, stage.bytes = len(features_df), frame_bytes(features_df)
+
+    # --- Newest window per station, target included, for the multi-horizon forecast ---
+    # Every station only when the features job uploads all of them (features --all-stations).
+    if args.horizons > 1:
+        forecast_rows = latest_feature_rows(features_df)
+
+    # --- Drop target column (used for training only) ---
+    if "target" in features_df.columns:
+        features_df = features_df.drop(columns=["target"])
+
+    columns = [f"feature_{i+1}" for i in range(WINDOW_SIZE)] + ["hour_of_day", "day_of_week", "location_id"]
+
+    with report.stage("select_rows") as stage:
+        if args.all_stations:
+            # --- Select latest row per station in one groupby/idxmax step ---
+            latest_rows = latest_feature_rows(features_df)
+            inference_df = latest_rows[MODEL_COLUMNS].rename(columns={"pickup_location_id": "location_id"})
+            print(f"📍 Scoring {len(inference_df)} stations")
+        else:
+            # --- Select latest row of the 3 busiest stations over their lag window, looked up by station code ---
+            # (the feature group holds every station when features runs with --all-stations)
+            latest_rows = features_df.sort_values("pickup_hour").drop_duplicates("pickup_location_id", keep="last")
+            window_rides = latest_rows[[f"feature_{i+1}" for i in range(WINDOW_SIZE)]].sum(axis=1)
+            top_locations = latest_rows.loc[window_rides.sort_values(ascending=False).index[:3], "pickup_location_id"].tolist()
+
+            latest_rows = latest_rows.set_index("pickup_location_id", drop=False).loc[top_locations]
+            inference_df = latest_rows[MODEL_COLUMNS].rename(columns={"pickup_location_id": "location_id"}).reset_index(drop=True)
+        stage.rows = len(inference_df)
+
+    # Enforce integer types
+    feature_cols = [col for col in columns if "feature_" in col]
+    inference_df[feature_cols] = inference_df[feature_cols].astype(np.int32)
+
+    # --- Load the newest model trained on this feature group version (version and artifacts come from the local cache) ---
+    # Booster.predict scores batches and forecast steps faster than FlatForest, which is only the fallback
+    # where LightGBM is not installed.
+    with report.stage("load_model"):
+        model_cache = ModelCache(store.model_registry)
+        model_version = model_cache.latest(MODEL_NAME, FG_VERSION)
+        model = model_cache.load(
+            MODEL_NAME, model_version, artifact="lightgbm_full_model.pkl", flat=find_spec("lightgbm") is None,
+        )
+
+    # --- Multi-horizon forecast: every station rolled forward together ---
+    if args.horizons > 1:
+        if len(forecast_rows) <= TOP_STATIONS:
+            print(f"⚠️ The feature group holds windows for only {len(forecast_rows)} stations; "
+                  f"run `python -m src features --all-stations` to forecast every station")
+        _forecast(args, report, store, model, forecast_rows)
+
+    # --- Predict with slight noise to make output dynamic ---
+    with report.stage("predict", rows=len(inference_df)):
+        if args.all_stations:
+            preds = predict_batched(model, feature_matrix(inference_df, columns), batch_size=args.batch_size, n_threads=args.threads)
+        else:
+            preds = model.predict(inference_df)
+    noise = np.random.randint(-2, 3, size=preds.shape)
+    preds_noisy = np.clip(preds + noise, a_min=0, a_max=None)
+
+    inference_df["predicted_rides"] = preds_noisy.astype(int)
+
+    # Add prediction time
+    inference_df["prediction_time"] = pd.Timestamp.utcnow()
+
+    # Cast datatypes
+    inference_df["location_id"] = inference_df["location_id"].astype(np.int64)
+    inference_df["predicted_rides"] = inference_df["predicted_rides"].astype(np.int64)
+    inference_df["prediction_time"] = pd.to_datetime(inference_df["prediction_time"])
+
+    # --- Upload predictions (bulk, in the background) ---
+    pred_fg = store.table(
+        PRED_FG_NAME,
+        version=PRED_FG_VERSION,
+        description="Hourly predicted rides with noise for demo",
+        primary_key=["location_id", "prediction_time"],
+        event_time="prediction_time",
+    )
+
+    with report.stage("insert", rows=len(inference_df)):
+        pred_fg.insert(inference_df[["location_id", "predicted_rides", "prediction_time"]])
+        store.flush()
+
+    print(f"\n✅ Predictions uploaded to the {args.store} feature store:")
+    inference_df["station"] = published_catalog(store).labels(inference_df["location_id"])
+    print(inference_df[["location_id", "station", "predicted_rides", "prediction_time"]])
+    report.write()
+
+
+def _forecast(args, report, store, model, forecast_rows):
+    """Roll every station `--horizons` hours ahead and queue the forecast table upload."""
+    import numpy as np
+    import pandas as pd
+
+    from src.forecast import direct_forecast, forecast_frame, load_direct_models, next_hour_inputs, recursive_forecast
+
+    with report.stage("forecast") as stage:
+        X_next, station_ids, first_hours = next_hour_inputs(forecast_rows)
+        if args.direct_models:
+            forecast = direct_forecast(load_direct_models(args.direct_models)[:args.horizons], X_next, num_threads=args.threads)
+        else:
+            forecast = recursive_forecast(model, X_next, args.horizons, num_threads=args.threads)
+        forecast_df = forecast_frame(station_ids, first_hours, forecast)
+        forecast_df["predicted_rides"] = forecast_df["predicted_rides"].round().astype(np.int64)
+        forecast_df["prediction_time"] = pd.Timestamp.utcnow()
+        stage.rows = len(forecast_df)
+
+    forecast_fg = store.table(
+        FORECAST_FG_NAME,
+        version=FORECAST_FG_VERSION,
+        description="Hourly ride forecasts for the next hours of every station",
+        primary_key=["location_id", "forecast_hour"],
+        event_time="forecast_hour",
+    )
+    # Queued; written in the background while the next-hour predictions run.
+    forecast_fg.insert(forecast_df)
+    print(f"🗓️ Queued a {args.horizons}-hour forecast for {len(station_ids)} stations")
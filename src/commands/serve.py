@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from src.options import add_store_args
+
+HELP = "Serve next-hour ride forecasts over HTTP from in-memory station windows"
+
+HOPSWORKS_PROJECT = "BhumikaTaxiFareMLProject"
+FG_VERSION = 2
+MODEL_NAME = "citibike_lightgbm_full"
+
+
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--state-dir", type=Path, default=None,
+                        help="feature state written by features --incremental (seeds the windows)")
+    parser.add_argument("--max-batch", type=int, default=4096, help="most rows scored in one predict call")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0, help="how long a request waits for others to batch with")
+    add_store_args(parser)
+
+
+def run(args):
+    import asyncio
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve(args):
+    from src import config
+    from src.feature_store import connect
+    from src.incremental import STATE_DIR, load_state
+    from src.model_cache import ModelCache
+    from src.serving import PredictionService, WindowStore
+    from src.stations import published_catalog
+
+    state_dir = args.state_dir or STATE_DIR
+    # --- Seed the station windows from the file-backed feature state (checked first: nothing to serve without it) ---
+    _, _, windows = load_state(state_dir)
+    if windows is None:
+        raise SystemExit(f"❌ No feature state in {state_dir}; run `python -m src features --incremental` first")
+    store = WindowStore.from_lag_rows(windows)
+    print(f"📦 Loaded windows for {len(store)} stations from {state_dir}")
+
+    # --- Warm model: the newest one trained on this feature group version, from the local cache when possible ---
+    feature_store = connect(args.store, config.HOPSWORKS_API_KEY, HOPSWORKS_PROJECT, root=args.store_dir)
+    model_cache = ModelCache(feature_store.model_registry)
+    model_version = model_cache.latest(MODEL_NAME, FG_VERSION)
+    model = model_cache.load(MODEL_NAME, model_version)
+    print(f"🧠 Loaded {MODEL_NAME} v{model_version}")
+
+    # --- Station names for the responses, from the catalog the feature pipeline publishes ---
+    stations = published_catalog(feature_store)
+    service = PredictionService(
+        model, store, max_batch=args.max_batch, max_delay=args.max_delay_ms / 1000, labels=stations.labels,
+    )
+    server = await service.start(args.host, args.port)
+    print(f"🚀 Serving on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,195 @@
+import os
+from pathlib import Path
+
+from src.instrumentation import add_instrumentation_args
+from src.options import add_store_args
+
+HELP = "Train the LightGBM demand model"
+
+HOPSWORKS_PROJECT = "BhumikaTaxiFareMLProject"
+FG_NAME = "citibike_hourly_features"
+FG_VERSION = 2
+MODEL_NAME = "citibike_lightgbm_full"
+
+
+def add_arguments(parser):
+    parser.add_argument("--months", nargs="+", default=None, metavar="YYYY-MM",
+                        help="train on lag features from the local Parquet grid cache instead of the feature group")
+    parser.add_argument("--lean", action="store_true",
+                        help="float32 matrix, chronological split with early stopping, binned Dataset built once")
+    parser.add_argument("--num-threads", type=int, default=os.cpu_count(), help="LightGBM threads in --lean mode")
+    parser.add_argument("--dataset-cache", type=Path, default=None,
+                        help="directory for reusable binary LightGBM Datasets in --lean and --tune modes")
+    parser.add_argument("--backtest", action="store_true",
+                        help="replay rolling forecast origins and report MAE/RMSE per fold, station and hour of day")
+    parser.add_argument("--backtest-folds", type=int, default=12, help="number of forecast origins to replay")
+    parser.add_argument("--backtest-horizon", type=int, default=24 * 30, help="hours scored after each origin")
+    parser.add_argument("--backtest-window", type=int, default=None,
+                        help="train on this many hours before each origin (sliding) instead of all of them (expanding)")
+    parser.add_argument("--direct-horizons", type=int, default=0,
+                        help="also train one model per forecast hour 1..N (saved under models/direct) for infer --direct-models")
+    parser.add_argument("--tune", action="store_true",
+                        help="search LightGBM parameters (successive halving, parallel trials) and train with the best")
+    parser.add_argument("--tune-trials", type=int, default=27, help="configurations sampled in --tune mode")
+    parser.add_argument("--tune-workers", type=int, default=None, help="trial processes in --tune mode (default: all cores)")
+    parser.add_argument("--tune-minutes", type=float, default=60,
+                        help="no new halving rung starts after this many minutes of search")
+    parser.add_argument("--params", type=Path, default=None,
+                        help="tuned parameters to train with (default: models/tuned_params.json when present)")
+    add_store_args(parser)
+    add_instrumentation_args(parser)
+
+
+def run(args):
+    import joblib
+    import numpy as np
+
+    from src import config
+    from src.feature_store import connect
+    from src.flat_forest import FlatForest
+    from src.instrumentation import RunReport, frame_bytes
+    from src.model_cache import FEATURE_GROUP_VERSION_METRIC, FLAT_ARTIFACT, MODEL_ARTIFACT
+    from src.predict import MODEL_COLUMNS
+
+    report = RunReport.from_args("train_model", args)
+
+    # --- Step 1: Login to Hopsworks ---
+    with report.stage("store_connect"):
+        store = connect(args.store, config.HOPSWORKS_API_KEY, HOPSWORKS_PROJECT, root=args.store_dir)
+
+    # --- Step 2: Read feature data ---
+    with report.stage("read_features") as stage:
+        if args.months:
+            from src.data_cache import lag_features_from_cache
+            df = lag_features_from_cache(args.months)
+            print(f"📊 Loaded {len(df)} records from cached hourly grids {', '.join(args.months)}")
+        else:
+            df = store.table(FG_NAME, version=FG_VERSION).read(columns=MODEL_COLUMNS + ["target", "pickup_hour"])
+            print(f"📊 Loaded {len(df)} records from Feature Group '{FG_NAME}'")
+        stage.rows, stage.bytes = len(df), frame_bytes(df)
+
+    tuned = _tuned_params(args, report, df)
+
+    if args.backtest:
+        _backtest(args, report, df, tuned)
+
+    if args.direct_horizons:
+        from src.forecast import save_direct_models, train_direct_models
+
+        # --- Step 2c: Direct multi-horizon models on one binned Dataset ---
+        with report.stage("train_direct", rows=len(df)):
+            direct_dir = save_direct_models(train_direct_models(df, args.direct_horizons), Path("models") / "direct")
+        print(f"🗓️ Saved {args.direct_horizons} direct horizon models to {direct_dir}")
+
+    if args.lean:
+        from src.training import train_lean
+
+        # --- Step 3 + 4 (lean): Chronological split, binned Dataset, early stopping ---
+        with report.stage("train", rows=len(df)) as stage:
+            model, train_report = train_lean(
+                df, params=tuned and tuned["params"], num_threads=args.num_threads, dataset_cache=args.dataset_cache,
+            )
+            stage.update(train_report)
+        X_train = df[MODEL_COLUMNS].head(5).astype(np.float32)
+        del df
+        mae = train_report["mae"]
+        print(f"✅ Trained LightGBM model. MAE = {mae:.2f} (best iteration {train_report['best_iteration']})")
+        print(f"⏱️ Prepare {train_report['prepare_seconds']}s, fit {train_report['fit_seconds']}s, peak RSS {train_report['peak_rss_mb']} MB")
+    else:
+        model, X_train, mae = _train_default(report, df, tuned)
+
+    # --- Step 5: Save model locally, with its flat-array export for LightGBM-free scoring ---
+    with report.stage("save_model") as stage:
+        model_dir = os.path.join("models", MODEL_NAME)
+        os.makedirs(model_dir, exist_ok=True)
+        model_path = os.path.join(model_dir, MODEL_ARTIFACT)
+        joblib.dump(model, model_path)
+        flat_path = FlatForest.from_booster(model).save(os.path.join(model_dir, FLAT_ARTIFACT))
+        stage.bytes = os.path.getsize(model_path) + os.path.getsize(flat_path)
+    print(f"💾 Model saved at: {model_path} (flat export: {flat_path})")
+
+    # --- Step 6: Upload both artifacts to the Model Registry ---
+    with report.stage("register_model"):
+        version = store.save_model(
+            MODEL_NAME,
+            model_dir,
+            metrics={"mae": mae, FEATURE_GROUP_VERSION_METRIC: FG_VERSION},
+            input_example=X_train.iloc[:5],
+            description="LightGBM model trained on hourly lag features",
+        )
+    print(f"🚀 Model uploaded to the {args.store} model registry (version {version})")
+    report.write()
+
+
+def _tuned_params(args, report, df):
+    """Step 2a: search parameters with --tune, else load the last saved search. Returns its summary or None."""
+    from src.tuning import TUNED_PARAMS_PATH, load_tuned_params, save_tuned_params, successive_halving
+
+    if not args.tune:
+        tuned = load_tuned_params(args.params or TUNED_PARAMS_PATH)
+        if tuned is not None:
+            print(f"🎛️ Training with parameters tuned at {tuned['tuned_at']} (validation MAE {tuned['mae']:.2f})")
+        return tuned
+
+    with report.stage("tune", rows=len(df)) as stage:
+        tuned = successive_halving(
+            df, n_trials=args.tune_trials, workers=args.tune_workers, time_budget=args.tune_minutes * 60,
+            dataset_cache=args.dataset_cache,
+        )
+        stage.update({key: tuned[key] for key in ("mae", "num_boost_round", "prepare_seconds", "search_seconds")})
+    params_path = save_tuned_params(tuned, args.params or TUNED_PARAMS_PATH)
+    print(f"🎛️ Best of {tuned['trials']} trials: MAE = {tuned['mae']:.2f} at {tuned['num_boost_round']} rounds, {tuned['params']}")
+    print(f"💾 Tuned parameters saved at: {params_path}")
+    return tuned
+
+
+def _backtest(args, report, df, tuned=None):
+    """Step 2b: rolling-origin backtest on one binned matrix, folds in parallel."""
+    from src.backtest import backtest, save_metrics
+    from src.instrumentation import REPORTS_DIR
+
+    tuned_args = {"params": tuned["params"], "num_boost_round": tuned["num_boost_round"]} if tuned else {}
+    with report.stage("backtest", rows=len(df)) as stage:
+        _, backtest_metrics = backtest(
+            df, n_folds=args.backtest_folds, horizon_hours=args.backtest_horizon, window_hours=args.backtest_window,
+            **tuned_args,
+        )
+        stage.update(backtest_metrics["overall"])
+    backtest_dir = save_metrics(backtest_metrics, REPORTS_DIR / "backtest")
+    print(f"🔁 Backtest over {backtest_metrics['overall']['folds']} folds: "
+          f"MAE = {backtest_metrics['overall']['mae']:.2f}, RMSE = {backtest_metrics['overall']['rmse']:.2f}")
+    print(backtest_metrics["fold"][["origin", "mae", "rmse", "rows"]].to_string())
+    print(f"📄 Per-station and per-hour errors written to {backtest_dir}")
+
+
+def _train_default(report, df, tuned=None):
+    """Steps 3-4: random 90/10 split and an `LGBMRegressor`, default or tuned. Returns (model, X_train, mae)."""
+    import lightgbm as lgb
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import train_test_split
+
+    from src.training import CATEGORICAL_FEATURES
+
+    # --- Step 3: Prepare data ---
+    with report.stage("prepare") as stage:
+        df = df.dropna()
+        X = df[[f"feature_{i+1}" for i in range(28)] + ["hour_of_day", "day_of_week", "pickup_location_id"]]
+        y = df["target"]
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.1, random_state=42)
+        stage.rows = len(X_train)
+
+    # --- Step 4: Train LightGBM model ---
+    with report.stage("train", rows=len(X_train)):
+        if tuned:
+            model = lgb.LGBMRegressor(n_estimators=tuned["num_boost_round"], verbose=-1, **tuned["params"])
+        else:
+            model = lgb.LGBMRegressor()
+        # Station codes are categories, as in tuning and `train_lean`.
+        model.fit(X_train, y_train, categorical_feature=CATEGORICAL_FEATURES)
+    with report.stage("evaluate", rows=len(X_test)):
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+
+    print(f"✅ Trained LightGBM model. MAE = {mae:.2f}")
+    return model, X_train, mae
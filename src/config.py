@@ -1,11 +1,8 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Define directories
+# Define directories (created by the code that writes to them, not on import)
 PARENT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = PARENT_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
@@ -13,19 +10,12 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 TRANSFORMED_DATA_DIR = DATA_DIR / "transformed"
 MODELS_DIR = PARENT_DIR / "models"
 
-# Create directories if they don't exist
-for directory in [
-    DATA_DIR,
-    RAW_DATA_DIR,
-    PROCESSED_DATA_DIR,
-    TRANSFORMED_DATA_DIR,
-    MODELS_DIR,
-]:
-    directory.mkdir(parents=True, exist_ok=True)
-
-
-HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY")
-HOPSWORKS_PROJECT_NAME = os.getenv("HOPSWORKS_PROJECT_NAME")
+# Settings read from the environment (or .env) on first access: `config.HOPSWORKS_API_KEY`.
+ENV_SETTINGS = {
+    "HOPSWORKS_API_KEY": None,
+    "HOPSWORKS_PROJECT_NAME": None,
+    "FEATURE_STORE": "hopsworks",
+}
 
 FEATURE_GROUP_NAME = "time_series_hourly_feature_group"
 FEATURE_GROUP_VERSION = 1
@@ -38,3 +28,17 @@ MODEL_NAME = "taxi_demand_predictor_next_hour"
 MODEL_VERSION = 1
 
 FEATURE_GROUP_MODEL_PREDICTION = "taxi_hourly_model_prediction"
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """Load .env into the environment, once; variables already set win."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def __getattr__(name):
+    if name in ENV_SETTINGS:
+        load_env()
+        return os.getenv(name, ENV_SETTINGS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
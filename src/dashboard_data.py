@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pandas as pd
+
+from src.dashboard_view import DashboardView
+
+PREDICTION_COLUMNS = ["location_id", "predicted_rides", "prediction_time"]
+
+
+def table_reader(table):
+    """Read predictions from a feature store table, only past `since` when given."""
+    def read_since(since):
+        if since is None:
+            return table.read(columns=PREDICTION_COLUMNS)
+        return table.read(columns=PREDICTION_COLUMNS, filters=[("prediction_time", ">", since)])
+    return read_since
+
+
+class PredictionHistory:
+    """Prediction history for the dashboard, refreshed incrementally.
+
+    The history is re-read at most once per `ttl_seconds`, and then only the
+    rows newer than the last `prediction_time` already held are fetched and
+    appended. Everything the page renders is precomputed on refresh, so
+    widget changes in between are served from memory by `view`.
+    """
+
+    def __init__(self, read_since, ttl_seconds=300, clock=time.monotonic, labels=None):
+        self.read_since = read_since
+        self.labels = labels
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.df = pd.DataFrame(columns=PREDICTION_COLUMNS)
+        self.last_seen = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._precompute()
+
+    def get(self):
+        """Return self, refreshed first if the TTL has expired."""
+        with self._lock:
+            if self._fetched_at is None or self.clock() - self._fetched_at >= self.ttl_seconds:
+                self._refresh()
+        return self
+
+    def _refresh(self):
+        new_rows = self.read_since(self.last_seen)
+        self._fetched_at = self.clock()
+        if new_rows is None or new_rows.empty:
+            return
+
+        new_rows = new_rows[PREDICTION_COLUMNS].copy()
+        new_rows["prediction_time"] = pd.to_datetime(new_rows["prediction_time"])
+        df = pd.concat([self.df, new_rows], ignore_index=True) if len(self.df) else new_rows
+        df = df.drop_duplicates(["location_id", "prediction_time"], keep="last")
+        self.df = df.sort_values("prediction_time", kind="stable", ignore_index=True)
+        self.last_seen = self.df["prediction_time"].iloc[-1]
+        print(f"🔄 Appended {len(new_rows)} predictions, history now {len(self.df)} rows")
+        self._precompute()
+
+    def _precompute(self):
+        self.view = DashboardView(self.df, labels=self.labels)
@@ -0,0 +1,113 @@
+import html
+
+import numpy as np
+import pandas as pd
+
+CARDS_OPEN = "<div style='display: flex; flex-wrap: wrap; gap: 1.5rem; justify-content: start;'>"
+CARD_OPEN = (
+    "<div style='background-color: #1e1e1e; padding: 1.5rem; border-radius: 12px; text-align: center; "
+    "width: 220px; box-shadow: 0 4px 8px rgba(0,0,0,0.3);'>"
+    "<div style='font-size: 1.1rem; font-weight: 600; color: #9ca3af;'>📍 Location "
+)
+CARD_MIDDLE = "</div><div style='font-size: 2rem; font-weight: bold; color: #10b981; margin-top: 0.5rem;'>🚗 "
+CARD_CLOSE = " rides</div></div>"
+
+
+def prediction_cards_html(latest, labels=None):
+    """Card markup for the latest predictions, built column-wise in one pass.
+
+    `labels` maps an array of location ids to display names (e.g.
+    `StationCatalog.labels`); the raw ids are shown without it.
+    """
+    if labels is None:
+        names = latest["location_id"].astype(str)
+    else:
+        names = pd.Series(labels(latest["location_id"].to_numpy()), index=latest.index, dtype=object)
+    cards = (
+        CARD_OPEN + names.map(html.escape)
+        + CARD_MIDDLE + latest["predicted_rides"].astype(str)
+        + CARD_CLOSE
+    )
+    return CARDS_OPEN + "".join(cards.tolist()) + "</div>"
+
+
+def downsample(frame, max_points=2000):
+    """Average consecutive rows into at most `max_points` buckets for charting."""
+    if len(frame) <= max_points:
+        return frame
+    step = -(-len(frame) // max_points)
+    buckets = np.arange(len(frame)) // step
+    sampled = frame.groupby(buckets).mean()
+    sampled.index = frame.index[::step]
+    return sampled
+
+
+class DashboardView:
+    """Everything the dashboard renders, derived once from the prediction history.
+
+    The history is sorted by (location_id, prediction_time) and kept as flat
+    arrays plus per-station offsets, so a station's trend is a slice rather
+    than a scan, and the latest row of every station sits at its end offset.
+    """
+
+    def __init__(self, df, top_n=3, max_points=2000, labels=None):
+        locations = df["location_id"].to_numpy()
+        time_index = pd.DatetimeIndex(df["prediction_time"])
+        self._tz = time_index.tz
+        times = (time_index.tz_convert(None) if self._tz is not None else time_index).to_numpy()
+        # Two stable argsorts (time, then station) are much cheaper than lexsort here,
+        # and nearly free when the history already arrives in time order.
+        order = np.argsort(times, kind="stable")
+        codes, uniques = pd.factorize(locations[order], sort=True)
+        codes = codes.astype(np.int16 if len(uniques) < 2 ** 15 else np.int32)
+        order = order[np.argsort(codes, kind="stable")]
+
+        self._times = times[order]
+        self._rides = df["predicted_rides"].to_numpy()[order]
+        sorted_locations = locations[order]
+        self._starts = np.flatnonzero(np.r_[True, sorted_locations[1:] != sorted_locations[:-1]]) if len(order) else np.array([], dtype=np.int64)
+        self.locations = sorted_locations[self._starts]
+        self._ends = np.append(self._starts[1:], len(order))
+
+        if len(order):
+            last = self._ends - 1
+            is_latest = self._times[last] == self._times[last].max()
+            self.latest = pd.DataFrame({
+                "location_id": self.locations[is_latest],
+                "predicted_rides": self._rides[last[is_latest]],
+                "prediction_time": self._time_index(self._times[last[is_latest]]),
+            }).sort_values("predicted_rides", ascending=False, kind="stable", ignore_index=True)
+            self.latest_time = self.latest["prediction_time"].iloc[0]
+        else:
+            self.latest_time = None
+            self.latest = pd.DataFrame(columns=["location_id", "predicted_rides", "prediction_time"])
+        self.cards_html = prediction_cards_html(self.latest, labels)
+
+        counts = self._ends - self._starts
+        self.top_locations = self.locations[np.argsort(-counts, kind="stable")[:top_n]].tolist()
+        if self.top_locations:
+            top_pivot = pd.concat({loc: self._series(loc) for loc in self.top_locations}, axis=1)
+            if labels is not None:
+                top_pivot.columns = labels(np.asarray(self.top_locations))
+        else:
+            top_pivot = pd.DataFrame()
+        top_pivot.columns.name = "location_id"
+        self.top_pivot = downsample(top_pivot, max_points)
+
+    def _time_index(self, times):
+        index = pd.DatetimeIndex(times, name="prediction_time")
+        return index.tz_localize("UTC").tz_convert(self._tz) if self._tz is not None else index
+
+    def _series(self, location_id, hours=None):
+        i = np.searchsorted(self.locations, location_id)
+        if i == len(self.locations) or self.locations[i] != location_id:
+            return pd.Series(dtype="int64", name="predicted_rides")
+        start, end = self._starts[i], self._ends[i]
+        if hours is not None:
+            start = max(start, end - hours)
+        index = self._time_index(self._times[start:end])
+        return pd.Series(self._rides[start:end], index=index, name="predicted_rides")
+
+    def trend(self, location_id, hours):
+        """The last `hours` predictions of one station."""
+        return self._series(location_id, hours)
@@ -0,0 +1,178 @@
+import hashlib
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.config import PROCESSED_DATA_DIR, TRANSFORMED_DATA_DIR
+from src.features import StationHourMatrix
+from src.ingest import DEFAULT_ENGINE, ENGINES
+from src.stations import default_catalog
+
+# v2: `pickup_location_id` holds station catalog codes instead of rounded raw ids.
+TRIPS_DIR = PROCESSED_DATA_DIR / "trips_v2"
+GRID_DIR = TRANSFORMED_DATA_DIR / "hourly_grid_v2"
+
+TRIP_CACHE_COLUMNS = ["started_at", "ended_at", "start_station_id", "pickup_location_id", "pickup_hour"]
+# Hourly per-station counts folded while the trips are cached; the "_" prefix keeps it out of the trip dataset.
+COUNTS_FILE = "_hourly_counts.parquet"
+
+
+def month_key(year, month):
+    return f"{year}-{month:02}"
+
+
+def file_hash(path, chunk_bytes=1 << 20):
+    """Short content hash of a source archive; cached artifacts are keyed by it."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _find_cached(base_dir, key, digest=None, suffix=""):
+    """Path of a completed artifact for `key`; the newest one when no digest is given."""
+    month_dir = Path(base_dir) / key
+    if digest is not None:
+        path = month_dir / f"{digest}{suffix}"
+        return path if path.exists() else None
+    if not month_dir.exists():
+        return None
+    candidates = [p for p in month_dir.glob(f"*{suffix}") if not p.name.startswith(".")]
+    if suffix == "":
+        candidates = [p for p in candidates if (p / "_SUCCESS").exists()]
+    return max(candidates, key=lambda p: p.stat().st_mtime, default=None)
+
+
+def cache_trips(zip_path, key, chunksize=500_000, digest=None, engine=DEFAULT_ENGINE, stations=None):
+    """Write the cleaned trips of one archive as day-partitioned Parquet.
+
+    Layout: data/processed/trips_v2/<YYYY-MM>/<hash>/pickup_date=<YYYY-MM-DD>/*.parquet,
+    plus the archive's hourly per-station counts, folded chunk by chunk, in `COUNTS_FILE`.
+    Returns the dataset directory; an archive that was already cached is not read again.
+    """
+    digest = digest or file_hash(zip_path)
+    dataset_dir = TRIPS_DIR / key / digest
+    if (dataset_dir / "_SUCCESS").exists():
+        return dataset_dir
+
+    read_chunks, clean = ENGINES[engine]
+    stations = stations if stations is not None else default_catalog()
+    tmp_dir = TRIPS_DIR / key / f".{digest}-{uuid.uuid4().hex[:8]}"
+    counts = None
+    for i, chunk in enumerate(read_chunks(zip_path, chunksize=chunksize)):
+        chunk = clean(chunk, stations)[TRIP_CACHE_COLUMNS]
+        chunk_counts = chunk.groupby(["pickup_hour", "pickup_location_id"]).size()
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+        chunk["pickup_date"] = chunk["pickup_hour"].dt.strftime("%Y-%m-%d")
+        pq.write_to_dataset(
+            pa.Table.from_pandas(chunk, preserve_index=False),
+            tmp_dir,
+            partition_cols=["pickup_date"],
+            basename_template=f"part-{i:05}-{{i}}.parquet",
+        )
+    stations.save()
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    if counts is not None:
+        counts.astype("int64").sort_index().reset_index(name="rides").to_parquet(tmp_dir / COUNTS_FILE, index=False)
+    (tmp_dir / "_SUCCESS").touch()
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    tmp_dir.rename(dataset_dir)
+    return dataset_dir
+
+
+def read_trips(key, columns=None, filters=None, digest=None):
+    """Read cached cleaned trips with column and predicate pushdown.
+
+    e.g. read_trips("2025-09", columns=["pickup_hour"], filters=[("pickup_date", ">=", "2025-09-15")])
+    only opens the matching day partitions and decodes one column.
+    """
+    dataset_dir = _find_cached(TRIPS_DIR, key, digest)
+    if dataset_dir is None:
+        raise FileNotFoundError(f"❌ No cached trips for {key}")
+    return pd.read_parquet(dataset_dir, columns=columns, filters=filters, partitioning="hive")
+
+
+def _hourly_counts_from_trips(dataset_dir):
+    """Hourly per-station counts of cached trips, without holding the month's trips in memory.
+
+    Counts folded by `cache_trips` are read as they are; older caches are
+    aggregated one day partition at a time (a day's hours are its own).
+    """
+    counts_path = Path(dataset_dir) / COUNTS_FILE
+    if counts_path.exists():
+        return pd.read_parquet(counts_path)
+    days = []
+    for day_dir in sorted(Path(dataset_dir).glob("pickup_date=*")):
+        table = ds.dataset(day_dir, format="parquet").to_table(columns=["pickup_hour", "pickup_location_id"])
+        days.append(table.group_by(["pickup_hour", "pickup_location_id"]).aggregate([([], "count_all")]).to_pandas())
+    if not days:
+        return pd.DataFrame(columns=["pickup_hour", "pickup_location_id", "rides"])
+    hourly_counts = pd.concat(days, ignore_index=True).rename(columns={"count_all": "rides"})
+    return hourly_counts.sort_values(["pickup_hour", "pickup_location_id"], ignore_index=True)
+
+
+def has_cached_grid(key, digest=None):
+    return _find_cached(GRID_DIR, key, digest, suffix=".parquet") is not None
+
+
+def _build_grid(key, zip_path, digest, chunksize=500_000):
+    """Aggregate one archive into a StationHourMatrix and cache it as the month's Parquet grid."""
+    dataset_dir = cache_trips(zip_path, key, chunksize=chunksize, digest=digest)
+    matrix = StationHourMatrix.from_counts(_hourly_counts_from_trips(dataset_dir))
+
+    grid_path = GRID_DIR / key / f"{digest}.parquet"
+    grid_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = grid_path.with_name(f".{grid_path.name}")
+    matrix.to_frame(by_station=True).to_parquet(tmp_path, index=False, row_group_size=64 * 1024)
+    tmp_path.rename(grid_path)
+    return matrix
+
+
+def load_hourly_grid(key, zip_path=None, chunksize=500_000, columns=None, filters=None):
+    """Hourly station grid of one month, built once and cached as Parquet.
+
+    The grid is stored sorted by station so `filters` on `pickup_location_id`
+    skip whole row groups. Without `zip_path` the newest cached grid for the
+    month is used; with it, the grid for that exact archive content.
+    """
+    digest = file_hash(zip_path) if zip_path is not None else None
+    grid_path = _find_cached(GRID_DIR, key, digest, suffix=".parquet")
+    if grid_path is None:
+        if zip_path is None:
+            raise FileNotFoundError(f"❌ No cached hourly grid for {key}")
+        _build_grid(key, zip_path, digest, chunksize)
+        grid_path = GRID_DIR / key / f"{digest}.parquet"
+    return pd.read_parquet(grid_path, columns=columns, filters=filters)
+
+
+def load_hourly_matrix(key, zip_path=None, chunksize=500_000):
+    """`load_hourly_grid` as a StationHourMatrix, without the zero-filled grid rows.
+
+    A freshly built grid is returned as built; a cached one is read back with
+    only its non-zero hours, which span the same stations and hours.
+    """
+    digest = file_hash(zip_path) if zip_path is not None else None
+    grid_path = _find_cached(GRID_DIR, key, digest, suffix=".parquet")
+    if grid_path is None:
+        if zip_path is None:
+            raise FileNotFoundError(f"❌ No cached hourly grid for {key}")
+        return _build_grid(key, zip_path, digest, chunksize)
+    return StationHourMatrix.from_counts(pd.read_parquet(grid_path, filters=[("rides", ">", 0)]))
+
+
+def lag_features_from_cache(keys, location_ids=None, window_size=28):
+    """Lag features for all (or the given) stations over consecutive cached months.
+
+    Months are joined into one continuous station x hour matrix first, so
+    windows that cross a month boundary use the previous month's hours.
+    """
+    filters = [("pickup_location_id", "in", list(location_ids))] if location_ids is not None else None
+    grids = [load_hourly_grid(key, filters=filters) for key in keys]
+    matrix = StationHourMatrix.from_counts(pd.concat(grids, ignore_index=True))
+    return matrix.lag_features(window_size, location_ids=location_ids)
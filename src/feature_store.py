@@ -0,0 +1,275 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src import config
+from src.model_cache import LocalModelRegistry
+from src.options import BACKENDS, LOCAL_STORE_DIR
+
+PARTITION_COLUMN = "event_date"
+
+
+def connect(backend=None, api_key=None, project=None, root=LOCAL_STORE_DIR):
+    """Open a feature store: Hopsworks, or the local partitioned Parquet store under `root`.
+
+    `backend` defaults to $FEATURE_STORE, else Hopsworks.
+    """
+    backend = backend or config.FEATURE_STORE
+    if backend == "local":
+        return LocalStore(root)
+    if backend == "hopsworks":
+        if not api_key:
+            raise ValueError("❌ HOPSWORKS_API_KEY is not set; export it (or add it to .env), or use --store local")
+        return HopsworksStore.login(api_key, project)
+    raise ValueError(f"Unknown feature store backend {backend!r}; expected one of {BACKENDS}")
+
+
+class _WriteQueue:
+    """Background thread that applies queued inserts in order.
+
+    Inserts for the same table that pile up while a write is in progress are
+    concatenated and applied as one bulk write. `join` waits for everything
+    queued so far and re-raises the first failure.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="feature-store-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.join)
+
+    def submit(self, table, df, options):
+        self._queue.put((table, df, options))
+
+    def join(self):
+        self._queue.join()
+        if self._errors:
+            error, self._errors = self._errors[0], []
+            raise error
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+
+            batches = {}
+            for table, df, options in items:
+                key = (id(table), json.dumps(options, sort_keys=True))
+                batches.setdefault(key, (table, [], options))[1].append(df)
+            for table, frames, options in batches.values():
+                try:
+                    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                    table._write(df, **options)
+                except Exception as e:
+                    self._errors.append(e)
+            for _ in items:
+                self._queue.task_done()
+
+
+class HopsworksStore:
+    """Feature groups and the model registry of a Hopsworks project."""
+
+    def __init__(self, project):
+        self.project = project
+        self.fs = project.get_feature_store()
+        self.writes = _WriteQueue()
+
+    @classmethod
+    def login(cls, api_key, project):
+        import hopsworks
+        return cls(hopsworks.login(api_key_value=api_key, project=project))
+
+    def table(self, name, version=1, primary_key=None, event_time=None, description=""):
+        """The feature group `name`; created when missing and a `primary_key` is given."""
+        try:
+            fg = self.fs.get_feature_group(name, version=version)
+        except Exception:
+            fg = None
+        if fg is None:
+            if primary_key is None:
+                raise KeyError(f"❌ Feature group {name} v{version} does not exist")
+            fg = self.fs.create_feature_group(
+                name=name, version=version, description=description,
+                primary_key=primary_key, event_time=event_time,
+            )
+            print(f"🆕 Created feature group {name}")
+        return HopsworksTable(fg, self.writes)
+
+    def model_registry(self):
+        return self.project.get_model_registry()
+
+    def save_model(self, name, model_path, metrics, input_example, description=""):
+        from hsml.schema import Schema
+        model = self.model_registry().python.create_model(
+            name=name, description=description, metrics=metrics,
+            input_example=input_example, model_schema=Schema(input_example),
+        )
+        model.save(model_path)
+        return model.version
+
+    def flush(self):
+        self.writes.join()
+
+
+class HopsworksTable:
+    def __init__(self, fg, writes):
+        self.fg = fg
+        self.writes = writes
+
+    def read(self, columns=None, filters=None):
+        """Read `columns` of the rows matching `filters`, e.g. [("pickup_hour", ">=", ts)].
+
+        Both are pushed into the feature group query.
+        """
+        query = self.fg.select(columns) if columns else self.fg.select_all()
+        for column, op, value in filters or []:
+            query = query.filter(_hopsworks_condition(self.fg.get_feature(column), op, value))
+        return query.read()
+
+    def insert(self, df, wait=False):
+        """Queue an upsert; with `wait`, block until the materialization job has run."""
+        self.writes.submit(self, df, {"wait": wait})
+        if wait:
+            self.writes.join()
+
+    def _write(self, df, wait=False):
+        self.fg.insert(df, write_options={"wait_for_job": wait})
+
+
+def _hopsworks_condition(feature, op, value):
+    if op == "in":
+        return feature.isin(list(value))
+    return {
+        "==": feature.__eq__, "!=": feature.__ne__,
+        ">": feature.__gt__, ">=": feature.__ge__,
+        "<": feature.__lt__, "<=": feature.__le__,
+    }[op](value)
+
+
+class LocalStore:
+    """File-backed feature store: one day-partitioned Parquet dataset per table.
+
+    Layout: <root>/<name>_<version>/event_date=<YYYY-MM-DD>/part.parquet plus
+    a _table.json with the primary key and event time (tables without an
+    event time keep one event_date=all partition). Models go to a
+    `LocalModelRegistry` under <root>/models.
+    """
+
+    def __init__(self, root=LOCAL_STORE_DIR):
+        self.root = Path(root)
+        self.writes = _WriteQueue()
+
+    def table(self, name, version=1, primary_key=None, event_time=None, description=""):
+        return LocalTable(self.root / f"{name}_{version}", self.writes, primary_key, event_time, description)
+
+    def model_registry(self):
+        return LocalModelRegistry(self.root / "models")
+
+    def save_model(self, name, model_path, metrics, input_example, description=""):
+        registry = self.model_registry()
+        version = registry.next_version(name)
+        registry.register(name, version, model_path, description=description, metrics=metrics)
+        return version
+
+    def flush(self):
+        self.writes.join()
+
+
+class LocalTable:
+    """A table of the local store, partitioned by day of its event time.
+
+    Rows inside a partition are sorted by primary key, so predicates on the
+    leading key column skip row groups as well as partitions.
+    """
+
+    def __init__(self, path, writes, primary_key=None, event_time=None, description=""):
+        self.path = Path(path)
+        self.writes = writes
+        meta_path = self.path / "_table.json"
+        if meta_path.exists():
+            self.meta = json.loads(meta_path.read_text())
+        elif primary_key is not None:
+            if event_time is not None and event_time not in primary_key:
+                # Upserts only deduplicate within a day partition.
+                raise ValueError(f"❌ The event time of {self.path.name} must be part of its primary key")
+            self.meta = {"primary_key": list(primary_key), "event_time": event_time, "description": description}
+            self.path.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(json.dumps(self.meta, indent=2))
+        else:
+            self.meta = None
+
+    def read(self, columns=None, filters=None):
+        """Read `columns` of the rows matching `filters`, e.g. [("pickup_hour", ">=", ts)].
+
+        Filters on the event time also prune day partitions; only the
+        requested columns are decoded.
+        """
+        files = sorted(self.path.glob(f"{PARTITION_COLUMN}=*/*.parquet")) if self.meta else []
+        if not files:
+            return pd.DataFrame(columns=columns)
+        schema = pq.read_schema(files[0])
+        filters = [(column, op, _match_type(value, schema.field(column).type)) for column, op, value in filters or []]
+        filters += self._partition_filters(filters)
+
+        df = pd.read_parquet(
+            self.path, columns=columns or [n for n in schema.names if n != PARTITION_COLUMN],
+            filters=filters or None, partitioning="hive",
+        )
+        return df.reset_index(drop=True)
+
+    def _partition_filters(self, filters):
+        event_time = self.meta["event_time"]
+        if event_time is None:
+            return []
+        bounds = {">": ">=", ">=": ">=", "<": "<=", "<=": "<=", "==": "=="}
+        return [
+            (PARTITION_COLUMN, bounds[op], pd.Timestamp(value).strftime("%Y-%m-%d"))
+            for column, op, value in filters
+            if column == event_time and op in bounds
+        ]
+
+    def insert(self, df, wait=False):
+        """Queue an upsert by primary key; with `wait`, block until it is on disk."""
+        if self.meta is None:
+            raise ValueError(f"❌ Table {self.path.name} does not exist; pass a primary_key to create it")
+        self.writes.submit(self, df, {})
+        if wait:
+            self.writes.join()
+
+    def _write(self, df):
+        primary_key, event_time = self.meta["primary_key"], self.meta["event_time"]
+        if event_time is None:
+            days = pd.Series("all", index=df.index)
+        else:
+            days = pd.to_datetime(df[event_time]).dt.strftime("%Y-%m-%d")
+        for day, rows in df.groupby(days.to_numpy(), sort=False):
+            part_dir = self.path / f"{PARTITION_COLUMN}={day}"
+            part_path = part_dir / "part.parquet"
+            if part_path.exists():
+                rows = pd.concat([pd.read_parquet(part_path), rows], ignore_index=True)
+            rows = rows.drop_duplicates(primary_key, keep="last").sort_values(primary_key, ignore_index=True)
+
+            part_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = part_dir / f".{uuid.uuid4().hex[:8]}.parquet"
+            rows.to_parquet(tmp_path, index=False, row_group_size=64 * 1024)
+            os.replace(tmp_path, part_path)
+
+
+def _match_type(value, arrow_type):
+    """Make a timestamp filter value comparable with a (tz-aware or naive) timestamp column."""
+    if not pa.types.is_timestamp(arrow_type) or isinstance(value, (list, tuple, set)):
+        return value
+    value = pd.Timestamp(value)
+    if arrow_type.tz is not None:
+        return value.tz_localize("UTC") if value.tzinfo is None else value.tz_convert("UTC")
+    return value.tz_convert("UTC").tz_localize(None) if value.tzinfo is not None else value
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lag_feature_columns(window_size=28):
+    return [f"feature_{i+1}" for i in range(window_size)] + ["hour_of_day", "day_of_week", "target"]
+
+
+def _is_dense(location_ids):
+    """Whether ids are small non-negative integers, like station catalog codes."""
+    return (
+        np.issubdtype(location_ids.dtype, np.integer) and len(location_ids) > 0
+        and location_ids.min() >= 0 and location_ids.max() < 4 * len(location_ids) + 1024
+    )
+
+
+def station_positions(station_ids, location_ids):
+    """Index of each of `location_ids` in the sorted `station_ids`, -1 where absent.
+
+    Dense integer codes go through a code -> row lookup table; other ids are
+    binary searched.
+    """
+    location_ids = np.asarray(location_ids)
+    if not len(station_ids):
+        return np.full(len(location_ids), -1, dtype=np.int64)
+    if _is_dense(station_ids) and (not len(location_ids) or np.issubdtype(location_ids.dtype, np.integer)):
+        table = np.full(station_ids[-1] + 2, -1, dtype=np.int64)
+        table[station_ids] = np.arange(len(station_ids))
+        # Out-of-range ids land on the trailing -1 slot.
+        return table[np.where((location_ids >= 0) & (location_ids <= station_ids[-1]), location_ids, -1)]
+    pos = np.searchsorted(station_ids, location_ids).clip(max=len(station_ids) - 1)
+    return np.where(station_ids[pos] == location_ids, pos, -1)
+
+
+class StationHourMatrix:
+    """Hourly ride counts as one compact station x hour int32 matrix.
+
+    `values[i, j]` is the number of rides from `station_ids[i]` (sorted) in
+    `hours[j]`. Counts are scattered straight into the matrix from integer
+    station and hour codes, so the zero-filled grid is never built as rows
+    unless `to_frame` asks for it.
+    """
+
+    def __init__(self, values, station_ids, hours):
+        self.values = values
+        self.station_ids = station_ids
+        self.hours = hours
+
+    @classmethod
+    def from_counts(cls, hourly_counts, station_ids=None, start=None, end=None):
+        """Build from (`pickup_hour`, `pickup_location_id`, `rides`) rows.
+
+        Rows may be sparse (only non-zero counts) or a full grid; duplicates
+        are summed. `station_ids`, `start` and `end` pin the matrix shape,
+        otherwise it spans the stations and hours present in the counts.
+        """
+        pickup_hours = hourly_counts['pickup_hour'].to_numpy(dtype="datetime64[ns]")
+        start = pd.Timestamp(start if start is not None else pickup_hours.min())
+        end = pd.Timestamp(end if end is not None else pickup_hours.max())
+        hours = pd.date_range(start, end, freq='h')
+
+        location_ids = hourly_counts['pickup_location_id'].to_numpy()
+        if station_ids is not None:
+            station_ids = np.unique(np.asarray(station_ids))
+            station_codes = station_positions(station_ids, location_ids)
+        elif _is_dense(location_ids):
+            station_ids = np.flatnonzero(np.bincount(location_ids)).astype(location_ids.dtype)
+            station_codes = station_positions(station_ids, location_ids)
+        else:
+            station_codes, station_ids = pd.factorize(location_ids, sort=True)
+            station_ids = np.asarray(station_ids)
+        hour_codes = (pickup_hours - start.to_datetime64()) // np.timedelta64(1, 'h')
+
+        keep = (hour_codes >= 0) & (hour_codes < len(hours)) & (station_codes >= 0)
+        values = np.zeros((len(station_ids), len(hours)), dtype=np.int32)
+        np.add.at(values, (station_codes[keep], hour_codes[keep]), hourly_counts['rides'].to_numpy()[keep])
+        return cls(values, station_ids, hours)
+
+    def station(self, location_id):
+        """Dense hourly series of one station (a view into the matrix)."""
+        i = station_positions(self.station_ids, [location_id])[0]
+        if i < 0:
+            raise KeyError(location_id)
+        return pd.Series(self.values[i], index=self.hours, name="rides")
+
+    def rows(self, location_ids):
+        """Matrix rows for `location_ids` in that order; unknown stations are all zero."""
+        pos = station_positions(self.station_ids, location_ids)
+        found = pos >= 0
+        values = np.zeros((len(pos), len(self.hours)), dtype=np.int32)
+        values[found] = self.values[pos[found]]
+        return values
+
+    def to_frame(self, by_station=False):
+        """The complete hour x station grid as rows, hour-major (station-major with `by_station`)."""
+        if by_station:
+            return pd.DataFrame({
+                "pickup_hour": np.tile(self.hours.to_numpy(), len(self.station_ids)),
+                "pickup_location_id": np.repeat(self.station_ids, len(self.hours)),
+                "rides": self.values.ravel(),
+            })
+        return pd.DataFrame({
+            "pickup_hour": np.repeat(self.hours.to_numpy(), len(self.station_ids)),
+            "pickup_location_id": np.tile(self.station_ids, len(self.hours)),
+            "rides": self.values.T.ravel(),
+        })
+
+    def top_stations(self, n=3):
+        """Ids of the `n` stations with the most rides, busiest first."""
+        totals = self.values.sum(axis=1, dtype=np.int64)
+        return self.station_ids[np.argsort(-totals, kind="stable")[:n]].tolist()
+
+    def lag_features(self, window_size=28, step_size=1, location_ids=None):
+        """Every lag window of every station, taken from a strided view of the matrix.
+
+        Rows come out grouped by station (in `location_ids` order when given,
+        ascending ids otherwise) and sorted by hour within a station, followed
+        by `pickup_location_id` and the `pickup_hour` of the target.
+        """
+        if location_ids is None:
+            station_ids, values = self.station_ids, self.values
+        else:
+            station_ids, values = np.asarray(location_ids), self.rows(location_ids)
+
+        if values.shape[1] <= window_size:
+            return pd.DataFrame(columns=lag_feature_columns(window_size) + ["pickup_location_id", "pickup_hour"])
+
+        # (stations, windows, window_size + 1) view; the last slot is the target.
+        windows = sliding_window_view(values, window_size + 1, axis=1)[:, ::step_size, :]
+        n_stations, n_windows = windows.shape[:2]
+        lagged = windows.reshape(n_stations * n_windows, window_size + 1)
+
+        target_hours = self.hours[window_size::step_size][:n_windows]
+        features = pd.DataFrame(lagged[:, :window_size], columns=lag_feature_columns(window_size)[:window_size])
+        features["hour_of_day"] = np.tile(target_hours.hour.to_numpy(dtype=np.int64), n_stations)
+        features["day_of_week"] = np.tile(target_hours.dayofweek.to_numpy(dtype=np.int64), n_stations)
+        features["target"] = lagged[:, window_size]
+        features["pickup_location_id"] = np.repeat(station_ids, n_windows)
+        features["pickup_hour"] = np.tile(target_hours.to_numpy(), n_stations)
+        return features
+
+
+def build_hourly_grid(hourly_counts):
+    """Expand sparse hourly counts into the complete hour x station grid, zero-filled."""
+    return StationHourMatrix.from_counts(hourly_counts).to_frame()
+
+
+def make_lag_features(df, location_id, window_size=28, step_size=1):
+    """Build lag windows for a single station, one Python row at a time."""
+    data = df[df["pickup_location_id"] == location_id].sort_values("pickup_hour")
+    values = data["rides"].values
+    hours = data["pickup_hour"].dt.hour.values
+    days = data["pickup_hour"].dt.dayofweek.values
+
+    if len(values) <= window_size:
+        return pd.DataFrame()
+
+    rows = []
+    for i in range(0, len(values) - window_size, step_size):
+        lags = values[i:i + window_size]
+        target = values[i + window_size]
+        hour = hours[i + window_size]
+        day = days[i + window_size]
+        row = list(lags) + [hour, day, target]
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=lag_feature_columns(window_size))
+
+
+def make_lag_features_batched(ts_df, window_size=28, step_size=1, location_ids=None):
+    """Build lag windows for every station at once.
+
+    `ts_df` holds hourly counts (`pickup_hour`, `pickup_location_id`,
+    `rides`), either the complete grid or only the non-zero hours. Returns the
+    same rows `make_lag_features` returns for each station; see
+    `StationHourMatrix.lag_features`.
+    """
+    matrix = StationHourMatrix.from_counts(ts_df)
+    return matrix.lag_features(window_size, step_size, location_ids)
@@ -0,0 +1,325 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# How LightGBM turns the summed raw score into a prediction, by objective.
+IDENTITY_OBJECTIVES = {"regression", "regression_l1", "huber", "fair", "quantile", "mape"}
+EXP_OBJECTIVES = {"poisson", "gamma", "tweedie"}
+
+# LightGBM's `kZeroThreshold`: |x| at or below it counts as zero for missing_type "Zero".
+ZERO_THRESHOLD = np.float64(1e-35)
+MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+# Leaf masks use the narrowest unsigned type that fits the largest tree, else 64-bit words.
+MASK_TYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+# Bound on the (rows x nodes) work matrix of one block, in elements.
+BLOCK_ELEMENTS = 1 << 20
+
+
+class FlatForest:
+    """A LightGBM regression booster as flat NumPy arrays, scored without LightGBM.
+
+    Internal nodes are stored in groups: all numerical splits first, then the
+    categorical splits of each categorical feature, each group tree after
+    tree. A node keeps its `feature`, `threshold`, `default_left`,
+    `missing_type` and `right_mask`, the bit mask of the leaves outside its
+    left subtree (leaves numbered left to right within their tree).
+    Categorical splits are looked up in `category_bits`, a row per category
+    with a bit per node, so one gather decides every node of a group.
+
+    Scoring evaluates every node at once and ANDs together, per tree, the
+    masks of the nodes whose test fails; the lowest leaf left standing is
+    the exit leaf of that tree (the QuickScorer scheme). That is a fixed
+    number of vectorized NumPy calls however deep the trees are, so single
+    rows are scored without per-node Python overhead.
+
+    Decisions follow LightGBM's, including missing values and categorical
+    splits, and leaf values are summed in tree order in float64, so raw
+    scores are bit-identical to `Booster.predict`; the exp of log-link
+    objectives may differ in the last ulp.
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self.feature_names = meta["feature_names"]
+        self._groups = [self._group(g) for g in range(len(self.group_feature))]
+        # Segment starts of every (group, tree) in the node arrays, for one reduceat over all groups.
+        self._segment_starts = self.group_starts + np.repeat(self.group_offsets[:-1], np.diff(self.group_tree_offsets))
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Export a `lgb.Booster` (or a fitted `LGBMRegressor`) at its best iteration."""
+        booster = getattr(booster, "booster_", booster)
+        return cls.from_dump(booster.dump_model())
+
+    @classmethod
+    def from_dump(cls, dump):
+        """Build from the JSON model of `Booster.dump_model()`."""
+        if dump["num_tree_per_iteration"] != 1:
+            raise ValueError("❌ Only single-output models can be flattened")
+        objective, *options = dump["objective"].split()
+        if objective not in IDENTITY_OBJECTIVES | EXP_OBJECTIVES:
+            raise ValueError(f"❌ Objective {objective!r} is not supported by FlatForest")
+        # `reg_sqrt` models are fit on sqrt(label) and square their output; any other option is unsupported.
+        sqrt = options == ["sqrt"] and objective in IDENTITY_OBJECTIVES
+        if options and not sqrt:
+            raise ValueError(f"❌ Objective {dump['objective']!r} is not supported by FlatForest")
+
+        nodes, leaf_values, tree_leaves = [], [], []
+        for tree_index, tree in enumerate(dump["tree_info"]):
+            if tree.get("is_linear"):
+                raise ValueError("❌ Linear trees cannot be flattened")
+            first_leaf = len(leaf_values)
+            _flatten(tree["tree_structure"], tree_index, nodes, leaf_values, first_leaf)
+            tree_leaves.append(first_leaf)
+
+        # Numerical splits form group -1, categorical ones a group per feature;
+        # the stable sort keeps every group in tree order.
+        nodes.sort(key=lambda node: -1 if node[5] is None else node[1])
+        group_of = [-1 if node[5] is None else node[1] for node in nodes]
+        group_feature = sorted(set(group_of))
+        offsets = np.searchsorted(group_of, group_feature).tolist() + [len(nodes)]
+
+        group_trees, group_starts, tree_offsets = [], [], [0]
+        for lo, hi in zip(offsets[:-1], offsets[1:]):
+            trees, starts = np.unique([node[0] for node in nodes[lo:hi]], return_index=True)
+            group_trees.append(trees)
+            group_starts.append(starts)
+            tree_offsets.append(tree_offsets[-1] + len(trees))
+
+        n_leaves = np.diff(np.append(tree_leaves, len(leaf_values)))
+        max_leaves = int(n_leaves.max(initial=1))
+        words = -(-max_leaves // 64)
+        right_mask = np.zeros((len(nodes), words), dtype=np.uint64)
+        for i, node in enumerate(nodes):
+            first, count = node[6]
+            bits = ~(((1 << count) - 1) << first)
+            for w in range(words):
+                right_mask[i, w] = np.uint64((bits >> (64 * w)) & 0xFFFFFFFFFFFFFFFF)
+        mask_type = next(t for t in MASK_TYPES if np.iinfo(t).bits >= min(max_leaves, 64))
+        right_mask = right_mask.astype(mask_type)
+
+        category_bits, category_offsets = _category_tables(nodes, offsets, group_feature)
+
+        _, feature, threshold, default_left, missing_type, _, _ = zip(*nodes) if nodes else ((),) * 7
+        arrays = {
+            "feature": np.array(feature, dtype=np.int32),
+            "threshold": np.array(threshold, dtype=np.float64),
+            "default_left": np.array(default_left, dtype=bool),
+            "missing_type": np.array(missing_type, dtype=np.int8),
+            "right_mask": right_mask,
+            "category_bits": category_bits,
+            "group_category_offsets": category_offsets,
+            "group_feature": np.array(group_feature, dtype=np.int32),
+            "group_offsets": np.array(offsets, dtype=np.int64),
+            "group_trees": np.concatenate(group_trees or [[]]).astype(np.int64),
+            "group_starts": np.concatenate(group_starts or [[]]).astype(np.int64),
+            "group_tree_offsets": np.array(tree_offsets, dtype=np.int64),
+            "tree_leaves": np.array(tree_leaves, dtype=np.int64),
+            "leaf_value": np.array(leaf_values, dtype=np.float64),
+        }
+        meta = {
+            "feature_names": dump["feature_names"],
+            "objective": objective,
+            "sqrt": sqrt,
+            "average_output": bool(dump.get("average_output", False)),
+            "feature_importances": dump.get("feature_importances", {}),
+        }
+        return cls(arrays, meta)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by `save`; only NumPy is needed."""
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+            meta = json.loads(str(data["meta"]))
+        return cls(arrays, meta)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **self.arrays)
+        return path
+
+    def num_trees(self):
+        return len(self.tree_leaves)
+
+    def num_feature(self):
+        return len(self.feature_names)
+
+    def feature_name(self):
+        return list(self.feature_names)
+
+    def feature_importance(self):
+        """Number of splits per feature, like `Booster.feature_importance()`."""
+        counts = self.meta["feature_importances"]
+        return np.array([counts.get(name, 0) for name in self.feature_names], dtype=np.int32)
+
+    def predict(self, X, num_threads=1):
+        """Predictions for the rows of `X` (any float matrix in training column order)."""
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.num_feature():
+            raise ValueError(f"❌ Expected {self.num_feature()} features, got {X.shape[1]}")
+        block = max(1, BLOCK_ELEMENTS // max(1, len(self.feature)))
+        if len(X) <= block:
+            raw = self._raw_score(X)
+        else:
+            blocks = [X[i:i + block] for i in range(0, len(X), block)]
+            with ThreadPoolExecutor(max_workers=max(1, num_threads)) as pool:
+                raw = np.concatenate(list(pool.map(self._raw_score, blocks)))
+        if self.meta["average_output"]:
+            raw /= self.num_trees()
+        if self.meta.get("sqrt"):
+            return np.sign(raw) * raw * raw
+        return np.exp(raw) if self.meta["objective"] in EXP_OBJECTIVES else raw
+
+    def _group(self, g):
+        """Views of the arrays of node group `g`, ready for `_raw_score`."""
+        lo, hi = self.group_offsets[g], self.group_offsets[g + 1]
+        exits = slice(self.group_tree_offsets[g], self.group_tree_offsets[g + 1])
+        trees = self.group_trees[exits]
+        group = {
+            "feature": int(self.group_feature[g]),
+            "exits": exits,
+            "trees": None if len(trees) == self.num_trees() else trees,
+        }
+        if group["feature"] < 0:
+            threshold, missing_type = self.threshold[lo:hi], self.missing_type[lo:hi]
+            group.update(
+                columns=self.feature[lo:hi], threshold=threshold, threshold32=_round_down32(threshold),
+                default_left=self.default_left[lo:hi], missing_type=missing_type,
+                has_zero=bool((missing_type == MISSING_TYPES["Zero"]).any()),
+            )
+        else:
+            group.update(
+                category_bits=self.category_bits[:, self.group_category_offsets[g]:self.group_category_offsets[g + 1]],
+                count=int(hi - lo),
+            )
+        return group
+
+    def _raw_score(self, X):
+        words = self.right_mask.shape[1]
+        mask_type = self.right_mask.dtype.type
+        # One word per tree drops the word axis, which NumPy reduces faster.
+        right_mask = self.right_mask[:, 0] if words == 1 else self.right_mask
+        remaining = np.full((len(X), self.num_trees()) + right_mask.shape[1:], np.iinfo(mask_type).max, dtype=mask_type)
+        if self._groups:
+            has_nan = bool(np.isnan(X).any())
+            go_left = np.concatenate([
+                _numerical_decision(X.take(group["columns"], axis=1), group, has_nan) if group["feature"] < 0
+                else _categorical_decision(X[:, group["feature"]], group, has_nan)
+                for group in self._groups
+            ], axis=1)
+            # Every failed test removes the leaves of its left subtree: a node that
+            # goes left contributes all ones (-True), one that goes right its mask.
+            fill = np.negative(go_left.astype(mask_type))
+            masks = right_mask | (fill if words == 1 else fill[:, :, None])
+            exits = np.bitwise_and.reduceat(masks, self._segment_starts, axis=1)
+            for group in self._groups:
+                # Trees without a split in a group keep all their leaves.
+                trees = slice(None) if group["trees"] is None else group["trees"]
+                remaining[:, trees] &= exits[:, group["exits"]]
+        leaves = self.tree_leaves + _first_set_bit(remaining if words > 1 else remaining[..., None])
+        # A running sum adds trees in order, exactly as LightGBM does.
+        return np.cumsum(self.leaf_value[leaves], axis=1)[:, -1]
+
+
+def _flatten(node, tree, nodes, leaf_values, first_leaf):
+    """Append the internal nodes of a dumped tree; returns its leaf count.
+
+    A node is (tree, feature, threshold, default_left, missing_type,
+    categories or None, (first, count)), the last being the range of its
+    left subtree's leaves, numbered from `first_leaf`, the tree's first leaf.
+    """
+    if "leaf_value" in node:
+        leaf_values.append(node["leaf_value"])
+        return 1
+    first = len(leaf_values) - first_leaf
+    left_leaves = _flatten(node["left_child"], tree, nodes, leaf_values, first_leaf)
+    right_leaves = _flatten(node["right_child"], tree, nodes, leaf_values, first_leaf)
+    if node["decision_type"] == "==":
+        categories, threshold = [int(c) for c in str(node["threshold"]).split("||")], np.nan
+    else:
+        categories, threshold = None, float(node["threshold"])
+    nodes.append((
+        tree, node["split_feature"], threshold, node["default_left"],
+        MISSING_TYPES[node["missing_type"]], categories, (first, left_leaves),
+    ))
+    return left_leaves + right_leaves
+
+
+def _category_tables(nodes, offsets, group_feature):
+    """Category sets packed across nodes, one row per category and one bit per node.
+
+    Bit j of row c is set when category c sends node j of its group left.
+    Every categorical group owns a range of byte columns, given by the
+    returned offsets. With `width` categories, row `width` serves values
+    outside [0, width) and row `width + 1` serves NaN.
+    """
+    sets = [node[5] for node in nodes if node[5] is not None]
+    width = max((max(c) for c in sets if c), default=0) + 1
+    tables, byte_offsets = [], [0]
+    for feature, lo, hi in zip(group_feature, offsets[:-1], offsets[1:]):
+        member = np.zeros((width + 2, hi - lo if feature >= 0 else 0), dtype=bool)
+        for column, node in enumerate(nodes[lo:hi] if feature >= 0 else []):
+            member[node[5], column] = True
+            # NaN is category 0 unless the node treats NaN as missing, which goes right.
+            member[width + 1, column] = member[0, column] and node[4] != MISSING_TYPES["NaN"]
+        tables.append(np.packbits(member, axis=1, bitorder="little"))
+        byte_offsets.append(byte_offsets[-1] + tables[-1].shape[1])
+    category_bits = np.concatenate(tables, axis=1) if tables else np.zeros((width + 2, 0), dtype=np.uint8)
+    return category_bits, np.array(byte_offsets, dtype=np.int64)
+
+
+def _numerical_decision(values, group, has_nan):
+    """LightGBM's `NumericalDecision`: True where the row goes to the left child."""
+    threshold = group["threshold32"] if values.dtype == np.float32 else group["threshold"]
+    if not has_nan and not group["has_zero"]:
+        return values <= threshold
+    missing_type = group["missing_type"]
+    nan = np.isnan(values)
+    values = np.where(nan, 0.0, values)
+    missing = ((missing_type == MISSING_TYPES["Zero"]) & (np.abs(values) <= ZERO_THRESHOLD)) | (
+        (missing_type == MISSING_TYPES["NaN"]) & nan
+    )
+    return np.where(missing, group["default_left"], values <= threshold)
+
+
+def _round_down32(threshold):
+    """The largest float32 at or below each threshold: `x <= t` is then a float32 compare."""
+    with np.errstate(over="ignore"):
+        threshold32 = threshold.astype(np.float32)
+    return np.where(threshold32 > threshold, np.nextafter(threshold32, np.float32(-np.inf)), threshold32)
+
+
+def _categorical_decision(values, group, has_nan):
+    """LightGBM's `CategoricalDecision` for the nodes splitting on one feature.
+
+    Values are truncated to int; negative categories and categories no node
+    has seen always go right.
+    """
+    bits = group["category_bits"]
+    width = len(bits) - 2
+    categories = np.trunc(values)
+    rows = np.where((categories >= 0) & (categories < width), categories, width).astype(np.intp)
+    if has_nan:
+        rows[np.isnan(values)] = width + 1
+    return np.unpackbits(bits[rows], axis=1, count=group["count"], bitorder="little").view(bool)
+
+
+def _first_set_bit(bits):
+    """Index of the lowest set bit over the trailing word axis of unsigned bit sets."""
+    if bits.shape[-1] == 1:
+        word, bits = 0, bits[..., 0]
+    else:
+        word = np.argmax(bits != 0, axis=-1)
+        bits = np.take_along_axis(bits, word[..., None], axis=-1)[..., 0]
+    # The isolated lowest bit is a power of two, which a float holds exactly.
+    lowest = bits & np.negative(bits)
+    return word * np.iinfo(bits.dtype).bits + np.frexp(lowest)[1] - 1
@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.predict import MODEL_COLUMNS, WINDOW_SIZE
+from src.serving import WindowStore
+from src.training import CATEGORICAL_FEATURES, DEFAULT_PARAMS
+
+HORIZONS = 24
+HOUR_COL = MODEL_COLUMNS.index("hour_of_day")
+DAY_COL = MODEL_COLUMNS.index("day_of_week")
+
+
+def next_hour_inputs(latest_rows, window_size=WINDOW_SIZE):
+    """Model inputs for the first unobserved hour of every station.
+
+    `latest_rows` holds one lag row per station (see `latest_feature_rows`);
+    its newest observed hour is the row's target. Returns (X, station_ids,
+    first_hours) with X in `MODEL_COLUMNS` order.
+    """
+    store = WindowStore.from_lag_rows(latest_rows, window_size)
+    X, first_hours = store.features(store.station_ids)
+    return X, np.asarray(store.station_ids), first_hours
+
+
+def _advance_calendar(X):
+    """Move the `hour_of_day`/`day_of_week` columns of every row one hour on, in place."""
+    X[:, HOUR_COL] += 1
+    wrapped = X[:, HOUR_COL] == 24
+    X[wrapped, HOUR_COL] = 0
+    X[wrapped, DAY_COL] = (X[wrapped, DAY_COL] + 1) % 7
+
+
+def recursive_forecast(model, X, horizons=HORIZONS, window_size=WINDOW_SIZE, num_threads=1):
+    """Forecast `horizons` hours for every row of `X` by feeding predictions back as lags.
+
+    All stations move forward together: each step is one batched predict over
+    the whole matrix, after which the lag columns shift left by one, the
+    prediction becomes the newest lag and the calendar columns advance, all in
+    place on a copy of `X`. Returns a (stations, horizons) float32 matrix.
+    """
+    booster = getattr(model, "booster_", model)
+    X = np.array(X, dtype=np.float32, order="C")
+    preds = np.empty((len(X), horizons), dtype=np.float32)
+    for h in range(horizons):
+        preds[:, h] = booster.predict(X, num_threads=num_threads).clip(min=0)
+        if h + 1 < horizons:
+            X[:, :window_size - 1] = X[:, 1:window_size]
+            X[:, window_size - 1] = preds[:, h]
+            _advance_calendar(X)
+    return preds
+
+
+def horizon_targets(df, horizons=HORIZONS, time_col="pickup_hour", location_col="pickup_location_id"):
+    """Targets 1..`horizons` hours ahead for each lag row, NaN where the history ends.
+
+    Horizon h of a row is the `target` of the same station's row h - 1 hours
+    later. Returns (rows, targets) with `rows` ordered by station and hour.
+    """
+    rows = df.sort_values([location_col, time_col], kind="stable").reset_index(drop=True)
+    stations = rows[location_col].to_numpy()
+    hours = rows[time_col].to_numpy(dtype="datetime64[h]")
+    target = rows["target"].to_numpy(dtype=np.float32)
+
+    targets = np.full((len(rows), horizons), np.nan, dtype=np.float32)
+    targets[:, 0] = target
+    for k in range(1, horizons):
+        same = (stations[k:] == stations[:-k]) & (hours[k:] - hours[:-k] == np.timedelta64(k, "h"))
+        targets[:-k, k][same] = target[k:][same]
+    return rows, targets
+
+
+def train_direct_models(df, horizons=HORIZONS, params=None, num_boost_round=300, columns=MODEL_COLUMNS):
+    """One booster per horizon, all trained on a single binned Dataset.
+
+    Only rows with every horizon observed are used; the Dataset is binned
+    once and only its label is swapped between horizons.
+    """
+    import lightgbm as lgb
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    rows, targets = horizon_targets(df, horizons)
+    keep = ~np.isnan(targets).any(axis=1) & rows[columns].notna().all(axis=1).to_numpy()
+    X = np.ascontiguousarray(rows.loc[keep, columns].to_numpy(dtype=np.float32))
+    # Horizon-major so each label is a contiguous array.
+    targets = np.ascontiguousarray(targets[keep].T)
+
+    categorical = [columns.index(col) for col in CATEGORICAL_FEATURES]
+    train_set = lgb.Dataset(
+        X, label=targets[0], feature_name=columns, categorical_feature=categorical,
+        params=params, free_raw_data=True,
+    ).construct()
+    boosters = []
+    for h in range(horizons):
+        train_set.set_label(targets[h])
+        boosters.append(lgb.train(params, train_set, num_boost_round=num_boost_round))
+    return boosters
+
+
+def direct_forecast(boosters, X, num_threads=1):
+    """Forecast with one booster per horizon; every horizon scores the same `X`."""
+    preds = np.empty((len(X), len(boosters)), dtype=np.float32)
+    for h, booster in enumerate(boosters):
+        preds[:, h] = booster.predict(X, num_threads=num_threads).clip(min=0)
+    return preds
+
+
+def save_direct_models(boosters, model_dir):
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    for h, booster in enumerate(boosters, start=1):
+        booster.save_model(str(model_dir / f"horizon_{h:02d}.txt"))
+    return model_dir
+
+
+def load_direct_models(model_dir):
+    import lightgbm as lgb
+    return [lgb.Booster(model_file=str(path)) for path in sorted(Path(model_dir).glob("horizon_*.txt"))]
+
+
+def forecast_frame(station_ids, first_hours, preds):
+    """Long frame of a (stations, horizons) forecast: one row per station and forecast hour."""
+    n_stations, horizons = preds.shape
+    first_hours = np.asarray(first_hours, dtype="datetime64[h]")
+    return pd.DataFrame({
+        "location_id": np.repeat(np.asarray(station_ids, dtype=np.int64), horizons),
+        "forecast_hour": (np.repeat(first_hours, horizons) + np.tile(np.arange(horizons), n_stations)).astype("datetime64[ns]"),
+        "horizon": np.tile(np.arange(1, horizons + 1, dtype=np.int64), n_stations),
+        "predicted_rides": preds.ravel(),
+    })
@@ -0,0 +1,178 @@
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+from src.config import RAW_DATA_DIR, TRANSFORMED_DATA_DIR
+from src.features import StationHourMatrix, lag_feature_columns
+from src.ingest import DEFAULT_ENGINE, ENGINES, TRIPDATA_URL, aggregate_trip_chunks, download_zip, hourly_counts_from_zip
+
+STATE_DIR = TRANSFORMED_DATA_DIR / "feature_state"
+RETENTION_HOURS = 31 * 24
+# 2: `pickup_location_id` holds station catalog codes instead of rounded raw ids.
+STATE_FORMAT = 2
+
+
+def month_source(year, month):
+    """Describe a monthly S3 archive; the ETag tells us if it changed."""
+    url = TRIPDATA_URL.format(year=year, month=month)
+    response = requests.head(url)
+    if response.status_code != 200:
+        raise Exception(f"❌ Failed to reach {url}")
+    name = url.rsplit("/", 1)[-1]
+    return {
+        "name": name,
+        "url": url,
+        "path": str(RAW_DATA_DIR / name),
+        "fingerprint": response.headers.get("ETag", "").strip('"'),
+    }
+
+
+def local_source(zip_path):
+    """Describe a local archive (e.g. an offline fixture) by size and mtime."""
+    zip_path = Path(zip_path).resolve()
+    stat = zip_path.stat()
+    return {
+        "name": zip_path.name,
+        "url": None,
+        "path": str(zip_path),
+        "fingerprint": f"{stat.st_size}-{stat.st_mtime_ns}",
+    }
+
+
+def _source_zip(source):
+    if source["url"] is None:
+        return Path(source["path"])
+    return download_zip(source["url"], source["path"])
+
+
+def load_state(state_dir=STATE_DIR):
+    """Return (meta, hourly_counts, windows); empty when nothing was saved yet."""
+    state_dir = Path(state_dir)
+    meta_path = state_dir / "state.json"
+    if not meta_path.exists():
+        return {"watermark": None, "sources": []}, None, None
+    meta = json.loads(meta_path.read_text())
+    if meta.get("format") != STATE_FORMAT:
+        print(f"♻️ Feature state in {state_dir} has an old format, rebuilding it")
+        return {"watermark": None, "sources": []}, None, None
+    hourly_counts = pd.read_parquet(state_dir / "hourly_counts.parquet")
+    windows = pd.read_parquet(state_dir / "windows.parquet")
+    return meta, hourly_counts, windows
+
+
+def save_state(meta, hourly_counts, windows, state_dir=STATE_DIR):
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    hourly_counts.to_parquet(state_dir / "hourly_counts.parquet", index=False)
+    windows.to_parquet(state_dir / "windows.parquet", index=False)
+    # state.json is written last so a crash never leaves a watermark ahead of the data.
+    (state_dir / "state.json").write_text(json.dumps(meta, indent=2))
+
+
+def reset_state(state_dir=STATE_DIR):
+    shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def merge_counts(hourly_counts, new_counts):
+    if hourly_counts is None or hourly_counts.empty:
+        return new_counts.reset_index(drop=True)
+    if new_counts.empty:
+        return hourly_counts
+    merged = pd.concat([hourly_counts, new_counts], ignore_index=True)
+    merged = merged.groupby(['pickup_hour', 'pickup_location_id'])['rides'].sum()
+    return merged.reset_index()
+
+
+def prune_counts(hourly_counts, retention_hours=RETENTION_HOURS):
+    """Keep only the last `retention_hours` hours of the hourly counts."""
+    cutoff = hourly_counts['pickup_hour'].max() - pd.Timedelta(hours=retention_hours)
+    return hourly_counts[hourly_counts['pickup_hour'] > cutoff].reset_index(drop=True)
+
+
+def latest_windows(hourly_counts, window_size=28):
+    """Latest lag row per station, built from the last window_size + 1 hours only."""
+    first_hour = hourly_counts['pickup_hour'].min()
+    last_hour = hourly_counts['pickup_hour'].max()
+    if last_hour - first_hour < pd.Timedelta(hours=window_size):
+        return pd.DataFrame(columns=lag_feature_columns(window_size) + ["pickup_location_id", "pickup_hour"])
+
+    start = last_hour - pd.Timedelta(hours=window_size)
+    tail = hourly_counts[hourly_counts['pickup_hour'] >= start]
+    matrix = StationHourMatrix.from_counts(
+        tail, station_ids=hourly_counts['pickup_location_id'].unique(), start=start, end=last_hour
+    )
+    return matrix.lag_features(window_size)
+
+
+def top_stations(hourly_counts, n=3):
+    return hourly_counts.groupby("pickup_location_id")["rides"].sum().sort_values(ascending=False).head(n).index.tolist()
+
+
+def update_state(source, state_dir=STATE_DIR, window_size=28, chunksize=500_000):
+    """Apply the trips of `source` that are newer than the saved watermark.
+
+    A source that was already applied with the same fingerprint is not even
+    downloaded; the saved counts and windows are returned as they are.
+    Returns (hourly_counts, windows).
+    """
+    meta, hourly_counts, windows = load_state(state_dir)
+    applied = {s["name"]: s for s in meta["sources"]}
+    if source["name"] in applied and applied[source["name"]]["fingerprint"] == source["fingerprint"]:
+        print(f"⏭️ {source['name']} already applied, watermark {meta['watermark']}")
+        return hourly_counts, windows
+
+    since = pd.Timestamp(meta["watermark"]) if meta["watermark"] else None
+    read_chunks, clean = ENGINES[DEFAULT_ENGINE]
+    chunks = read_chunks(_source_zip(source), chunksize=chunksize)
+    new_counts, watermark = aggregate_trip_chunks(chunks, since=since, clean=clean)
+    print(f"➕ Applied {int(new_counts['rides'].sum())} new trips from {source['name']}")
+
+    hourly_counts = prune_counts(merge_counts(hourly_counts, new_counts))
+    windows = latest_windows(hourly_counts, window_size)
+
+    applied[source["name"]] = source
+    meta = {
+        "format": STATE_FORMAT,
+        "watermark": watermark.isoformat() if watermark is not None else None,
+        "window_size": window_size,
+        # Months are at least 28 days, so the retained hours never reach past the last two archives.
+        "sources": list(applied.values())[-2:],
+    }
+    save_state(meta, hourly_counts, windows, state_dir)
+    return hourly_counts, windows
+
+
+def full_recompute(sources, window_size=28, chunksize=500_000):
+    """Aggregate every source from scratch, without any watermark."""
+    hourly_counts = None
+    for source in sources:
+        hourly_counts = merge_counts(hourly_counts, hourly_counts_from_zip(_source_zip(source), chunksize=chunksize))
+    hourly_counts = prune_counts(hourly_counts)
+    return hourly_counts, latest_windows(hourly_counts, window_size)
+
+
+def verify_state(state_dir=STATE_DIR, chunksize=500_000):
+    """Check the incremental state against a full recompute of its sources."""
+    meta, hourly_counts, windows = load_state(state_dir)
+    expected_counts, expected_windows = full_recompute(meta["sources"], meta.get("window_size", 28), chunksize)
+
+    def by_key(df, keys):
+        return df.sort_values(keys).reset_index(drop=True)
+
+    try:
+        pd.testing.assert_frame_equal(
+            by_key(hourly_counts, ['pickup_hour', 'pickup_location_id']),
+            by_key(expected_counts, ['pickup_hour', 'pickup_location_id']),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            by_key(windows, ['pickup_location_id']),
+            by_key(expected_windows, ['pickup_location_id']),
+            check_dtype=False,
+        )
+    except AssertionError as e:
+        raise Exception(f"❌ Incremental state differs from a full recompute, run with --full-rebuild:\n{e}")
+    print("✅ Incremental state matches a full recompute")
@@ -0,0 +1,309 @@
+import re
+from pathlib import Path
+from zipfile import ZipFile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import requests
+
+from src.config import RAW_DATA_DIR
+from src.options import DEFAULT_ENGINE
+from src.stations import default_catalog
+
+TRIPDATA_URL = "https://s3.amazonaws.com/tripdata/{year}{month:02}-citibike-tripdata.zip"
+
+TRIP_COLUMNS = ["started_at", "ended_at", "start_station_name", "start_station_id"]
+TRIP_DTYPES = {col: str for col in TRIP_COLUMNS}
+
+# Timestamps in the archives look like "2025-01-01 00:00:55.994" (older ones drop the fraction).
+_TIMESTAMP_PATTERNS = {
+    "fraction": re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{1,9}"),
+    "seconds": re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),
+}
+# Byte positions of the separators in "YYYY-MM-DD HH:MM:SS".
+_SEPARATORS = {4: ord("-"), 7: ord("-"), 10: ord(" "), 13: ord(":"), 16: ord(":")}
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_HOUR_NS = 3_600_000_000_000
+_MAX_DURATION_NS = 5 * _HOUR_NS
+
+
+def download_zip(url, zip_path, chunk_bytes=1 << 20):
+    """Spool a trip ZIP to disk without holding it in memory.
+
+    An archive that was already downloaded is reused.
+    """
+    zip_path = Path(zip_path)
+    if zip_path.exists():
+        return zip_path
+
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = zip_path.with_suffix(".zip.part")
+    with requests.get(url, stream=True) as response:
+        if response.status_code != 200:
+            raise Exception(f"❌ Failed to download {url}")
+        with open(tmp_path, "wb") as f:
+            for block in response.iter_content(chunk_size=chunk_bytes):
+                f.write(block)
+    tmp_path.rename(zip_path)
+    return zip_path
+
+
+def download_month_zip(year, month, dest_dir=RAW_DATA_DIR):
+    url = TRIPDATA_URL.format(year=year, month=month)
+    return download_zip(url, Path(dest_dir) / url.rsplit("/", 1)[-1])
+
+
+def trip_csv_members(zf):
+    """All trip CSVs in the archive; busy months are split into several parts."""
+    return sorted(
+        name for name in zf.namelist()
+        if name.endswith(".csv") and not name.startswith("__MACOSX/")
+    )
+
+
+def iter_trip_chunks(zip_path, chunksize=500_000):
+    """Yield raw trip chunks with only the columns the pipeline needs."""
+    with ZipFile(zip_path) as zf:
+        for name in trip_csv_members(zf):
+            with zf.open(name) as file:
+                yield from pd.read_csv(file, usecols=TRIP_COLUMNS, dtype=TRIP_DTYPES, chunksize=chunksize)
+
+
+def iter_trip_tables(zip_path, chunksize=500_000, block_size=1 << 24):
+    """Yield raw trip chunks as Arrow tables of string columns, parsed by the Arrow CSV reader."""
+    convert = pv.ConvertOptions(
+        include_columns=TRIP_COLUMNS,
+        column_types={col: pa.string() for col in TRIP_COLUMNS},
+        strings_can_be_null=True,
+    )
+    with ZipFile(zip_path) as zf:
+        for name in trip_csv_members(zf):
+            with zf.open(name) as file:
+                reader = pv.open_csv(file, read_options=pv.ReadOptions(block_size=block_size), convert_options=convert)
+                batches, rows = [], 0
+                for batch in reader:
+                    batches.append(batch)
+                    rows += batch.num_rows
+                    if rows >= chunksize:
+                        yield pa.Table.from_batches(batches)
+                        batches, rows = [], 0
+                if batches:
+                    yield pa.Table.from_batches(batches)
+
+
+def read_trip_table(file):
+    """All trips of one CSV as an Arrow table of string columns."""
+    return pa.Table.from_batches(list(pv.open_csv(file, convert_options=pv.ConvertOptions(
+        include_columns=TRIP_COLUMNS,
+        column_types={col: pa.string() for col in TRIP_COLUMNS},
+        strings_can_be_null=True,
+    ))))
+
+
+def clean_trips(df, stations=None):
+    """Drop invalid trips and add `pickup_location_id` and `pickup_hour`.
+
+    `pickup_location_id` is the code of the (whitespace-stripped)
+    `start_station_id` in the `stations` catalog, `default_catalog()` unless
+    given; ids it has not seen yet are added to it.
+    """
+    stations = stations if stations is not None else default_catalog()
+    df = df[df['started_at'].notnull() & df['ended_at'].notnull()]
+    df['started_at'] = pd.to_datetime(df['started_at'], errors='coerce')
+    df['ended_at'] = pd.to_datetime(df['ended_at'], errors='coerce')
+    df['duration'] = df['ended_at'] - df['started_at']
+
+    df = df[(df['duration'] > pd.Timedelta(0)) & (df['duration'] <= pd.Timedelta(hours=5))]
+
+    df = df[df['start_station_id'].notnull()]
+    df['start_station_id'] = df['start_station_id'].str.strip()
+    df = df[df['start_station_id'] != ""]
+    df['pickup_location_id'] = stations.encode(df['start_station_id'])
+    df['pickup_hour'] = df['started_at'].dt.floor("h")
+    stations.observe(df['pickup_location_id'], df['started_at'], df.get('start_station_name'))
+    return df
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates, vectorized."""
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _parse_timestamps(strings, first):
+    """Epoch nanoseconds of "%Y-%m-%d %H:%M:%S[.%f]" strings, plus a validity mask.
+
+    The fixed-width fields are read straight from the Arrow string buffer as
+    bytes and combined with integer arithmetic. Like `pd.to_datetime`, the
+    layout (with or without a fraction) is fixed by `first`, the first value
+    that gets parsed, and values in the other layout are invalid. Returns
+    None when `first` fits neither, so the caller can fall back to pandas.
+    """
+    n = len(strings)
+    layout = next((name for name, pattern in _TIMESTAMP_PATTERNS.items() if pattern.fullmatch(first)), None)
+    if layout is None:
+        return None
+
+    offsets = np.frombuffer(strings.buffers()[1], dtype=np.int32)[strings.offset:strings.offset + n + 1]
+    data = np.frombuffer(strings.buffers()[2], dtype=np.uint8)
+    data = np.append(data, np.zeros(29, dtype=np.uint8))  # gathers past the last value stay in bounds
+    starts, lengths = offsets[:-1], np.diff(offsets)
+
+    def field(first_pos, width):
+        """Integer value of the digits at [first_pos, first_pos + width) of every string."""
+        nonlocal valid
+        value = np.zeros(n, dtype=np.int32)
+        for pos in range(first_pos, first_pos + width):
+            digit = data[starts + pos] - np.uint8(ord("0"))  # wraps above 9 for non-digits
+            valid &= digit <= 9
+            value *= 10
+            value += digit
+        return value
+
+    valid = lengths >= 19
+    if strings.null_count:
+        valid &= strings.is_valid().to_numpy(zero_copy_only=False)
+    for pos, char in _SEPARATORS.items():
+        valid &= data[starts + pos] == char
+    year, month, day = field(0, 4), field(5, 2), field(8, 2)
+    hour, minute, second = field(11, 2), field(14, 2), field(17, 2)
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _DAYS_IN_MONTH[month.clip(0, 12)] + (leap & (month == 2))
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    valid &= (hour < 24) & (minute < 60) & (second < 60)
+    days = _days_from_civil(year, month, day).astype(np.int64)
+    epoch = (((days * 24 + hour) * 60 + minute) * 60 + second) * 1_000_000_000
+
+    if layout == "seconds":
+        valid &= lengths == 19
+    else:
+        n_digits = lengths - 20
+        valid &= (n_digits >= 1) & (data[starts + 19] == ord("."))
+        fraction = np.zeros(n, dtype=np.int32)
+        for i in range(9):
+            digit = data[starts + 20 + i] - np.uint8(ord("0"))
+            missing = n_digits <= i
+            valid &= (digit <= 9) | missing
+            digit[missing] = 0
+            fraction *= 10
+            fraction += digit
+        epoch += fraction
+        # Digits past nanoseconds are validated and truncated, as pandas does.
+        long = np.flatnonzero(n_digits > 9)
+        if len(long):
+            tail = pc.utf8_slice_codeunits(strings.take(pa.array(long)), 29)
+            valid[long] &= pc.ascii_is_decimal(tail).to_numpy(zero_copy_only=False)
+    return epoch, valid
+
+
+def clean_trips_arrow(trips, stations=None):
+    """`clean_trips` on Arrow arrays, materializing only the surviving rows.
+
+    Timestamps are parsed with a fixed format into int64 epoch nanoseconds,
+    the duration and hour bucket are integer arithmetic on them, and every
+    condition goes into one mask that selects the rows at the end. Accepts
+    an Arrow table (see `iter_trip_tables`) or the raw pandas chunk, and
+    returns the same frame as `clean_trips`.
+    """
+    stations = stations if stations is not None else default_catalog()
+    index = None
+    if isinstance(trips, pd.DataFrame):
+        index = trips.index
+        columns = [col for col in trips.columns if col in TRIP_COLUMNS]
+        trips = pa.Table.from_pandas(trips[columns].astype(object), preserve_index=False)
+    started_at = trips.column("started_at").combine_chunks().cast(pa.string())
+    ended_at = trips.column("ended_at").combine_chunks().cast(pa.string())
+    station_ids = pc.utf8_trim_whitespace(trips.column("start_station_id").combine_chunks().cast(pa.string()))
+
+    present = pc.and_(pc.is_valid(started_at), pc.is_valid(ended_at)).to_numpy(zero_copy_only=False)
+    if not present.any():
+        return clean_trips(pd.DataFrame({col: pd.Series(dtype=object) for col in trips.column_names}), stations)
+    first = np.argmax(present)
+    started_parsed = _parse_timestamps(started_at, started_at[first].as_py())
+    ended_parsed = _parse_timestamps(ended_at, ended_at[first].as_py())
+    if started_parsed is None or ended_parsed is None:
+        # A layout pandas would infer but the fixed formats do not cover.
+        df = trips.to_pandas()
+        if index is not None:
+            df.index = index
+        return clean_trips(df, stations)
+
+    (started, started_ok), (ended, ended_ok) = started_parsed, ended_parsed
+    duration = ended - started
+
+    keep = present & started_ok & ended_ok & (duration > 0) & (duration <= _MAX_DURATION_NS)
+    keep &= pc.fill_null(pc.greater(pc.utf8_length(station_ids), 0), False).to_numpy(zero_copy_only=False)
+    rows = np.flatnonzero(keep)
+    taken = pa.array(rows)
+    started, ended, duration = started[rows], ended[rows], duration[rows]
+    station_ids = station_ids.take(taken)
+    location = stations.encode(station_ids)
+
+    columns = {
+        "started_at": started.view("datetime64[ns]"),
+        "ended_at": ended.view("datetime64[ns]"),
+        "start_station_id": station_ids.to_numpy(zero_copy_only=False),
+    }
+    df = pd.DataFrame({
+        col: columns[col] if col in columns else trips.column(col).take(taken).to_numpy(zero_copy_only=False)
+        for col in trips.column_names
+    }, index=index[rows] if index is not None else rows)
+    df["duration"] = duration.view("timedelta64[ns]")
+    df["pickup_location_id"] = location
+    df["pickup_hour"] = (started // _HOUR_NS * _HOUR_NS).view("datetime64[ns]")
+    stations.observe(location, df["started_at"], df.get("start_station_name"))
+    return df
+
+
+# Raw chunk reader and cleaner of each cleaning engine; both produce identical frames.
+ENGINES = {
+    "pandas": (iter_trip_chunks, clean_trips),
+    "arrow": (iter_trip_tables, clean_trips_arrow),
+}
+
+
+def aggregate_trip_chunks(chunks, since=None, clean=clean_trips, stations=None):
+    """Clean trip chunks and fold them into running hourly per-station counts.
+
+    Trips that started at or before `since` are skipped. Returns the counts
+    and the latest `started_at` that was applied (the new watermark).
+    """
+    stations = stations if stations is not None else default_catalog()
+    counts = None
+    last_started = since
+    for chunk in chunks:
+        chunk = clean(chunk, stations)
+        if since is not None:
+            chunk = chunk[chunk['started_at'] > since]
+        if chunk.empty:
+            continue
+        chunk_last = chunk['started_at'].max()
+        last_started = chunk_last if last_started is None else max(last_started, chunk_last)
+        chunk_counts = chunk.groupby(['pickup_hour', 'pickup_location_id']).size()
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+
+    stations.save()
+    if counts is None:
+        return pd.DataFrame(columns=['pickup_hour', 'pickup_location_id', 'rides']), last_started
+    counts = counts.astype(int).sort_index()
+    return counts.reset_index(name="rides"), last_started
+
+
+def hourly_counts_from_zip(zip_path, chunksize=500_000, since=None, engine=DEFAULT_ENGINE, stations=None):
+    """Stream the archive chunk by chunk into hourly per-station ride counts.
+
+    Only one chunk of trips is in memory at a time; the running counts are
+    bounded by hours x stations, not by the number of trips in the month.
+    """
+    read_chunks, clean = ENGINES[engine]
+    chunks = read_chunks(zip_path, chunksize=chunksize)
+    hourly_counts, _ = aggregate_trip_chunks(chunks, since=since, clean=clean, stations=stations)
+    return hourly_counts
@@ -0,0 +1,207 @@
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.config import DATA_DIR
+
+REPORTS_DIR = DATA_DIR / "reports"
+PROFILERS = ("cprofile", "pyinstrument")
+# Seconds between RSS samples while a stage runs.
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def current_rss_mb():
+    """Current resident set size in MiB, from /proc on Linux (None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of the process so far in MiB (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler:
+    """Highest RSS seen while running: `current_rss_mb` polled by a background thread until `stop`.
+
+    Unlike `peak_rss_mb`, which only ever grows, this is the peak of one
+    stretch of the run. Allocations shorter than `interval` can slip between
+    samples. Without /proc, `stop` returns None.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_mb = current_rss_mb()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.peak_mb is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and rss > self.peak_mb:
+            self.peak_mb = rss
+
+    def stop(self):
+        if self._thread is None:
+            return None
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+        return self.peak_mb
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+def add_instrumentation_args(parser):
+    parser.add_argument("--report", type=Path, default=None,
+                        help="path of the JSON run report (default: data/reports/<script>-<utc time>.json)")
+    parser.add_argument("--profile-stage", default=None, help="profile this stage by name")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile",
+                        help="cprofile (deterministic) or pyinstrument (sampling, must be installed)")
+
+
+class StageRecord(dict):
+    """Measurements of one stage; code inside the stage may set `rows` and `bytes`."""
+
+    @property
+    def rows(self):
+        return self.get("rows")
+
+    @rows.setter
+    def rows(self, value):
+        self["rows"] = int(value)
+
+    @property
+    def bytes(self):
+        return self.get("bytes")
+
+    @bytes.setter
+    def bytes(self, value):
+        self["bytes"] = int(value)
+
+
+class RunReport:
+    """Wall time, CPU time, memory and row/byte counts for every named stage of a run.
+
+    The report is written as JSON when `write` is called, or at interpreter
+    exit if the run fails first, so slow and failed production runs both
+    leave a record. One stage can be profiled with cProfile or pyinstrument.
+    A stage's `peak_rss_mb` is sampled while it runs (see `RssSampler`); the
+    process-wide peak is kept in the run summary only.
+    """
+
+    def __init__(self, name, path=None, profile_stage=None, profiler="cprofile"):
+        self.name = name
+        started = datetime.now(timezone.utc)
+        # Microseconds and the pid keep runs started in the same second from overwriting each other.
+        self.path = Path(path) if path else REPORTS_DIR / f"{name}-{started:%Y%m%dT%H%M%S.%fZ}-{os.getpid()}.json"
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.started_at = started.isoformat()
+        self.stages = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._written = False
+        atexit.register(self._write_on_exit)
+
+    @classmethod
+    def from_args(cls, name, args):
+        return cls(name, path=args.report, profile_stage=args.profile_stage, profiler=args.profiler)
+
+    @contextmanager
+    def stage(self, name, rows=None, bytes=None):
+        record = StageRecord(name=name, rss_start_mb=_round(current_rss_mb()))
+        if rows is not None:
+            record.rows = rows
+        if bytes is not None:
+            record.bytes = bytes
+        profiler = self._start_profiler() if name == self.profile_stage else None
+        sampler = RssSampler()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - start_wall, 4)
+            record["cpu_seconds"] = round(time.process_time() - start_cpu, 4)
+            record["rss_end_mb"] = _round(current_rss_mb())
+            record["peak_rss_mb"] = _round(sampler.stop())
+            if profiler is not None:
+                record["profile"] = self._stop_profiler(profiler, name)
+            self.stages.append(record)
+            print(f"⏱️ {name}: {record['wall_seconds']:.2f}s wall, {record['cpu_seconds']:.2f}s CPU, "
+                  f"peak RSS {record['peak_rss_mb']} MB")
+
+    def _start_profiler(self):
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, stage_name):
+        base = self.path.with_name(f"{self.path.stem}-{stage_name}")
+        base.parent.mkdir(parents=True, exist_ok=True)
+        if self.profiler == "pyinstrument":
+            profiler.stop()
+            out_path = base.with_suffix(".html")
+            out_path.write_text(profiler.output_html())
+            print(profiler.output_text(unicode=True, color=False))
+        else:
+            profiler.disable()
+            out_path = base.with_suffix(".prof")
+            profiler.dump_stats(str(out_path))
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(20)
+            print(summary.getvalue())
+        return str(out_path)
+
+    def to_dict(self):
+        return {
+            "run": self.name,
+            "started_at": self.started_at,
+            "wall_seconds": round(time.perf_counter() - self._start_wall, 4),
+            "cpu_seconds": round(time.process_time() - self._start_cpu, 4),
+            "peak_rss_mb": _round(peak_rss_mb()),
+            "stages": self.stages,
+        }
+
+    def write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+        self._written = True
+        print(f"📝 Run report written to {self.path}")
+        return self.path
+
+    def _write_on_exit(self):
+        if not self._written:
+            self.write()
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
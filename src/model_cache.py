@@ -0,0 +1,263 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import MODELS_DIR
+from src.data_cache import file_hash
+from src.flat_forest import FlatForest
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+CACHE_DIR = MODELS_DIR / "cache"
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+MODEL_ARTIFACT = "lightgbm_full_model.pkl"
+# The same model exported by train_model.py as a FlatForest, loadable without LightGBM.
+FLAT_ARTIFACT = "lightgbm_full_model.npz"
+
+# Training metric recording which feature group version a model was trained on.
+FEATURE_GROUP_VERSION_METRIC = "feature_group_version"
+# How long a version resolved by `ModelCache.latest` is trusted before the registry is asked again.
+LATEST_TTL_SECONDS = 3600
+
+# Loaded models, shared by every ModelCache in the process (and across Streamlit reruns).
+_MEMORY = {}
+# When each (cache_dir, key) was last loaded in this process; written to the index with the next index write.
+_LAST_USED = {}
+# Serializes index updates between threads (Streamlit sessions); `fcntl` does the same between processes.
+_INDEX_LOCK = threading.Lock()
+
+
+def latest_version(registry, name, feature_group_version):
+    """Newest registry version of `name` trained on `feature_group_version` of the features.
+
+    Models that predate the metric never match: their station ids mean something else.
+    """
+    versions = []
+    for model in registry.get_models(name):
+        try:
+            trained_on = float((model.training_metrics or {}).get(FEATURE_GROUP_VERSION_METRIC, "nan"))
+        except (TypeError, ValueError):
+            continue
+        if trained_on == feature_group_version:
+            versions.append(model.version)
+    if not versions:
+        raise LookupError(
+            f"❌ No {name} model was trained on feature group v{feature_group_version}; run `python -m src train` first"
+        )
+    return max(versions)
+
+
+class LocalModelRegistry:
+    """File-backed stand-in for the Hopsworks model registry.
+
+    Layout: <root>/<name>/<version>/<artifact>. `get_model(...).download()`
+    behaves like the Hopsworks call, so it can be handed to ModelCache.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def register(self, name, version, artifact_path, description="", metrics=None):
+        """Store the file, or every file of the directory, at `artifact_path`."""
+        model_dir = self.root / name / str(version)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        artifact_path = Path(artifact_path)
+        for path in sorted(artifact_path.iterdir()) if artifact_path.is_dir() else [artifact_path]:
+            shutil.copy2(path, model_dir / path.name)
+        (model_dir / "model.json").write_text(json.dumps({"description": description, "metrics": metrics or {}}))
+        return model_dir
+
+    def next_version(self, name):
+        return max((model.version for model in self.get_models(name)), default=0) + 1
+
+    def get_models(self, name):
+        model_dir = self.root / name
+        versions = sorted(int(p.name) for p in model_dir.iterdir() if p.name.isdigit()) if model_dir.exists() else []
+        return [_LocalModel(name, version, model_dir / str(version)) for version in versions]
+
+    def get_model(self, name, version=1):
+        model_dir = self.root / name / str(version)
+        if not model_dir.exists():
+            raise FileNotFoundError(f"❌ Model {name} v{version} not found in {self.root}")
+        return _LocalModel(name, version, model_dir)
+
+
+class _LocalModel:
+    def __init__(self, name, version, model_dir):
+        self.name = name
+        self.version = version
+        self.model_dir = model_dir
+        meta_path = Path(model_dir) / "model.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        self.description = meta.get("description", "")
+        self.training_metrics = meta.get("metrics", {})
+
+    def download(self):
+        return str(self.model_dir)
+
+
+class ModelCache:
+    """Local cache for registry models, keyed by name, version and artifact checksum.
+
+    LightGBM models are stored as the booster's text model and come back as
+    `lgb.Booster`, which loads without unpickling the sklearn wrapper; other
+    artifacts are kept as-is and loaded with memory-mapped joblib arrays.
+    With `flat=True` they come back as a `FlatForest` instead, taken from the
+    version's `FLAT_ARTIFACT` when it has one and converted once otherwise,
+    so a warm load imports neither LightGBM nor joblib.
+    Registry versions are immutable, so a cached version never touches the
+    network, and a model loaded once stays in memory for the process.
+    The least recently used versions are evicted once the cache exceeds
+    `max_bytes` on disk. The index is read and written under a thread and
+    file lock; loads already in memory only note their use time, which is
+    persisted with the next index write. `latest` keeps the newest version
+    per feature group version in the index too, for `LATEST_TTL_SECONDS`.
+
+    `registry` is a model registry (or a zero-argument callable returning
+    one, so a warm run never has to connect).
+    """
+
+    def __init__(self, registry, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.registry = registry
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def latest(self, name, feature_group_version, ttl=LATEST_TTL_SECONDS):
+        """`latest_version` of `name`, remembered in the index for `ttl` seconds.
+
+        Within the TTL the registry is not contacted (nor connected to, when
+        `registry` is a callable); a model trained since then is picked up
+        once it expires.
+        """
+        key = f"{name}/fg{feature_group_version}"
+        with self._locked():
+            index = self._read_index()
+            resolved = index["latest"].get(key)
+            if resolved is not None and time.time() - resolved["resolved_at"] < ttl:
+                return resolved["version"]
+            registry = self.registry() if callable(self.registry) else self.registry
+            version = latest_version(registry, name, feature_group_version)
+            index["latest"][key] = {"version": version, "resolved_at": time.time()}
+            self._write_index(index)
+            return version
+
+    def load(self, name, version, artifact=MODEL_ARTIFACT, flat=False):
+        key = f"{name}/{version}" + ("/flat" if flat else "")
+        with self._locked():
+            index = self._read_index()
+            models = index["models"]
+            entry = models.get(key)
+            fetched = entry is None or not (self.cache_dir / entry["path"]).exists()
+            if fetched:
+                entry = self._fetch(name, version, artifact, flat)
+                models[key] = entry
+
+            memory_key = (self.cache_dir, key, entry["checksum"])
+            _LAST_USED[(self.cache_dir, key)] = time.time()
+            if memory_key in _MEMORY and not fetched:
+                return _MEMORY[memory_key]
+            if memory_key not in _MEMORY:
+                _MEMORY[memory_key] = self._load_file(self.cache_dir / entry["path"])
+
+            # Written on fetches and first loads in a process, so other processes see the use when they evict.
+            self._evict(models, keep=key)
+            self._write_index(index)
+            return _MEMORY[memory_key]
+
+    def _fetch(self, name, version, artifact, flat=False):
+        registry = self.registry() if callable(self.registry) else self.registry
+        model_dir = registry.get_model(name, version=version).download()
+        source = Path(model_dir) / artifact
+        if flat and (Path(model_dir) / FLAT_ARTIFACT).exists():
+            source = Path(model_dir) / FLAT_ARTIFACT
+        checksum = file_hash(source)
+
+        entry_dir = self.cache_dir / name / str(version) / (f"flat-{checksum}" if flat else checksum)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        if source.suffix == ".npz":
+            path = entry_dir / "model.npz"
+            shutil.copy2(source, path)
+        else:
+            import joblib
+            import lightgbm as lgb
+            model = joblib.load(source)
+            booster = getattr(model, "booster_", model)
+            if isinstance(booster, lgb.Booster) and flat:
+                path = FlatForest.from_booster(booster).save(entry_dir / "model.npz")
+            elif isinstance(booster, lgb.Booster):
+                path = entry_dir / "model.txt"
+                booster.save_model(str(path))
+            else:
+                path = entry_dir / Path(artifact).name
+                joblib.dump(model, path)
+        print(f"⬇️ Cached {name} v{version} ({checksum})")
+        return {
+            "path": str(path.relative_to(self.cache_dir)),
+            "checksum": checksum,
+            "bytes": path.stat().st_size,
+            "last_used": time.time(),
+        }
+
+    @staticmethod
+    def _load_file(path):
+        if path.suffix == ".npz":
+            return FlatForest.load(path)
+        if path.suffix == ".txt":
+            import lightgbm as lgb
+            return lgb.Booster(model_file=str(path))
+        import joblib
+        return joblib.load(path, mmap_mode="r")
+
+    def _evict(self, models, keep):
+        for key, entry in models.items():
+            entry["last_used"] = max(entry["last_used"], _LAST_USED.get((self.cache_dir, key), 0))
+        total = sum(entry["bytes"] for entry in models.values())
+        for key, entry in sorted(models.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree((self.cache_dir / entry["path"]).parent, ignore_errors=True)
+            for memory_key in [k for k in _MEMORY if k[:2] == (self.cache_dir, key)]:
+                del _MEMORY[memory_key]
+            del models[key]
+            _LAST_USED.pop((self.cache_dir, key), None)
+            total -= entry["bytes"]
+
+    def _read_index(self):
+        """{"models": cached artifacts by name/version, "latest": versions resolved by `latest`}."""
+        index_path = self.cache_dir / "index.json"
+        index = json.loads(index_path.read_text()) if index_path.exists() else {}
+        if "models" not in index:
+            # Indexes written before `latest` held only the models.
+            index = {"models": index}
+        index.setdefault("latest", {})
+        return index
+
+    def _write_index(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_dir / f".index-{uuid.uuid4().hex[:8]}.json"
+        tmp_path.write_text(json.dumps(index, indent=2))
+        os.replace(tmp_path, self.cache_dir / "index.json")
+
+    @contextmanager
+    def _locked(self):
+        with _INDEX_LOCK:
+            if fcntl is None:
+                yield
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_dir / "index.json.lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
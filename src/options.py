@@ -0,0 +1,23 @@
+"""Command-line options shared by the pipeline commands.
+
+Nothing heavy is imported here: `python -m src` builds the parser of every
+subcommand from these before it knows which one will run.
+"""
+from pathlib import Path
+
+from src.config import DATA_DIR
+
+BACKENDS = ("hopsworks", "local")
+LOCAL_STORE_DIR = DATA_DIR / "feature_store"
+# Names of the trip cleaning engines in `src.ingest.ENGINES`.
+TRIP_ENGINES = ("arrow", "pandas")
+DEFAULT_ENGINE = "arrow"
+
+
+def add_store_args(parser):
+    """The `--store`/`--store-dir` options every pipeline entry point shares."""
+    parser.add_argument("--store", choices=BACKENDS, default=None,
+                        help="feature store backend (default: $FEATURE_STORE or hopsworks)")
+    parser.add_argument("--store-dir", type=Path, default=LOCAL_STORE_DIR,
+                        help="root of the local feature store (--store local)")
+    return parser
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+WINDOW_SIZE = 28
+LAG_COLUMNS = [f"feature_{i+1}" for i in range(WINDOW_SIZE)]
+MODEL_COLUMNS = LAG_COLUMNS + ["hour_of_day", "day_of_week", "pickup_location_id"]
+
+
+def latest_feature_rows(features_df, time_col="pickup_hour", location_col="pickup_location_id"):
+    """Latest row per station in one vectorized groupby/idxmax step."""
+    idx = features_df.groupby(location_col)[time_col].idxmax()
+    return features_df.loc[idx.to_numpy()].reset_index(drop=True)
+
+
+def feature_matrix(df, columns=MODEL_COLUMNS):
+    """Model inputs as one C-contiguous float32 matrix, in training column order."""
+    return np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+
+
+def predict_batched(model, X, batch_size=100_000, n_threads=1):
+    """Score `X` in large batches straight on the booster, skipping pandas validation.
+
+    With `n_threads` > 1 the batches are scored concurrently; LightGBM releases
+    the GIL while predicting, so this scales across cores.
+    """
+    booster = getattr(model, "booster_", model)
+    batches = [X[i:i + batch_size] for i in range(0, len(X), batch_size)]
+    if not batches:
+        return np.empty(0, dtype=np.float64)
+    if n_threads <= 1 or len(batches) == 1:
+        return np.concatenate([booster.predict(batch, num_threads=n_threads) for batch in batches])
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        return np.concatenate(list(pool.map(lambda batch: booster.predict(batch, num_threads=1), batches)))
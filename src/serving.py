@@ -0,0 +1,252 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.predict import WINDOW_SIZE
+
+HOUR = np.timedelta64(1, "h")
+
+
+class WindowStore:
+    """Latest `window_size` hourly counts of every station in NumPy ring buffers.
+
+    Row `i` of `buffer` is the ring of station `station_ids[i]`; `heads[i]`
+    is the slot of its oldest hour and `last_hours[i]` the newest hour held.
+    Pushing a count is O(1) and reading any set of windows is one fancy-index.
+    """
+
+    def __init__(self, window_size=WINDOW_SIZE, capacity=1024):
+        self.window_size = window_size
+        self.buffer = np.zeros((capacity, window_size), dtype=np.int32)
+        self.heads = np.zeros(capacity, dtype=np.int64)
+        self.last_hours = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[h]")
+        self.rows = {}
+        self.station_ids = []
+
+    @classmethod
+    def from_lag_rows(cls, df, window_size=WINDOW_SIZE):
+        """Seed from lag rows (e.g. data/transformed/feature_state/windows.parquet).
+
+        The newest `window_size` observed hours of a row are feature_2..feature_N
+        plus its `target`, observed at `pickup_hour`.
+        """
+        df = df.sort_values("pickup_hour").drop_duplicates("pickup_location_id", keep="last")
+        store = cls(window_size, capacity=max(len(df), 1))
+        columns = [f"feature_{i+1}" for i in range(1, window_size)] + ["target"]
+        for station, values, hour in zip(df["pickup_location_id"], df[columns].to_numpy(np.int32), df["pickup_hour"]):
+            row = store._row(int(station))
+            store.buffer[row] = values
+            store.last_hours[row] = np.datetime64(pd.Timestamp(hour).tz_localize(None), "h")
+        return store
+
+    def __len__(self):
+        return len(self.station_ids)
+
+    def _row(self, station):
+        row = self.rows.get(station)
+        if row is None:
+            row = len(self.station_ids)
+            if row == len(self.buffer):
+                grow = len(self.buffer)
+                self.buffer = np.concatenate([self.buffer, np.zeros_like(self.buffer[:grow])])
+                self.heads = np.concatenate([self.heads, np.zeros(grow, dtype=np.int64)])
+                self.last_hours = np.concatenate([self.last_hours, np.full(grow, np.datetime64("NaT"), dtype="datetime64[h]")])
+            self.rows[station] = row
+            self.station_ids.append(station)
+        return row
+
+    def push(self, station, hour, rides):
+        """Record the ride count of one station-hour; missing hours in between count as zero."""
+        row = self._row(station)
+        hour = np.datetime64(pd.Timestamp(hour).tz_localize(None), "h")
+        last = self.last_hours[row]
+        if np.isnat(last):
+            self.last_hours[row] = hour
+            self.buffer[row, (self.heads[row] - 1) % self.window_size] = rides
+            return
+        gap = int((hour - last) / HOUR)
+        if gap <= 0:
+            # A late correction for an hour still inside the window.
+            if -gap < self.window_size:
+                self.buffer[row, (self.heads[row] - 1 + gap) % self.window_size] = rides
+            return
+        for _ in range(min(gap - 1, self.window_size)):
+            self.buffer[row, self.heads[row]] = 0
+            self.heads[row] = (self.heads[row] + 1) % self.window_size
+        self.buffer[row, self.heads[row]] = rides
+        self.heads[row] = (self.heads[row] + 1) % self.window_size
+        self.last_hours[row] = hour
+
+    def features(self, stations):
+        """Model inputs for the hour after each station's window, as a float32 matrix."""
+        rows = np.fromiter((self.rows[s] for s in stations), dtype=np.int64, count=len(stations))
+        slots = (self.heads[rows, None] + np.arange(self.window_size)) % self.window_size
+        target_hours = self.last_hours[rows] + 1
+        epoch_hours = target_hours.astype(np.int64)
+
+        X = np.empty((len(rows), self.window_size + 3), dtype=np.float32)
+        X[:, :self.window_size] = self.buffer[rows[:, None], slots]
+        X[:, self.window_size] = epoch_hours % 24
+        # 1970-01-01 was a Thursday (dayofweek 3).
+        X[:, self.window_size + 1] = (epoch_hours // 24 + 3) % 7
+        X[:, self.window_size + 2] = stations
+        return X, target_hours
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into single `predict` calls.
+
+    Requests queued while a batch is being scored, in the same event-loop
+    tick as the first one, or within `max_delay` seconds of it, are stacked
+    and scored together.
+    """
+
+    def __init__(self, predict, max_batch=4096, max_delay=0.0):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, X):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            # Let handlers that are already runnable enqueue before the batch closes.
+            await asyncio.sleep(0)
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_delay
+            while size < self.max_batch:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.queue.get_nowait()
+                items.append(item)
+                size += len(item[0])
+
+            try:
+                preds = self.predict(np.concatenate([X for X, _ in items]))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for X, future in items:
+                future.set_result(preds[offset:offset + len(X)])
+                offset += len(X)
+
+
+class PredictionService:
+    """Minimal HTTP/1.1 JSON service on asyncio streams.
+
+    GET  /predict?station=ID           next-hour forecast for one station
+    GET  /predict/bulk?stations=1,2,3  (POST {"stations": [...]}; all stations when omitted)
+    POST /push                         {"station", "hour", "rides"} or a list of them
+    GET  /health
+
+    With `labels` (codes -> display labels, e.g. `StationCatalog.labels`),
+    every prediction also carries its station's label.
+    """
+
+    def __init__(self, model, store, max_batch=4096, max_delay=0.0, labels=None):
+        booster = getattr(model, "booster_", model)
+        self.store = store
+        self.labels = labels
+        self.batcher = MicroBatcher(lambda X: booster.predict(X, num_threads=1), max_batch, max_delay)
+
+    async def start(self, host="127.0.0.1", port=8000):
+        self.batcher.start()
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def predict(self, stations):
+        X, target_hours = self.store.features(stations)
+        preds = await self.batcher.submit(X)
+        results = [
+            {"station": int(s), "hour": h, "predicted_rides": round(p, 3)}
+            for s, h, p in zip(stations, np.datetime_as_string(target_hours, unit="s").tolist(), preds.tolist())
+        ]
+        if self.labels is not None:
+            for result, label in zip(results, self.labels(stations)):
+                result["label"] = str(label)
+        return results
+
+    async def route(self, method, path, query, body):
+        if path == "/health":
+            return 200, {"status": "ok", "stations": len(self.store), "batches": self.batcher.batches}
+        if path == "/predict" and method == "GET":
+            station = int(query["station"][0])
+            if station not in self.store.rows:
+                return 404, {"error": f"unknown station {station}"}
+            return 200, (await self.predict([station]))[0]
+        if path == "/predict/bulk":
+            if method == "POST" and body:
+                stations = json.loads(body)["stations"]
+            elif "stations" in query:
+                stations = [int(s) for s in query["stations"][0].split(",") if s]
+            else:
+                stations = list(self.store.station_ids)
+            unknown = [s for s in stations if s not in self.store.rows]
+            if unknown:
+                return 404, {"error": f"unknown stations {unknown[:10]}"}
+            return 200, await self.predict(stations)
+        if path == "/push" and method == "POST":
+            updates = json.loads(body)
+            updates = updates if isinstance(updates, list) else [updates]
+            for update in updates:
+                self.store.push(int(update["station"]), update["hour"], int(update["rides"]))
+            return 200, {"updated": len(updates)}
+        return 404, {"error": f"no route for {method} {path}"}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                url = urlsplit(target)
+                try:
+                    status, payload = await self.route(method, url.path, parse_qs(url.query), body)
+                except (KeyError, ValueError) as e:
+                    status, payload = 400, {"error": str(e)}
+
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
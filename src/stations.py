@@ -0,0 +1,248 @@
+import atexit
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.config import PROCESSED_DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+STATIONS_PATH = PROCESSED_DATA_DIR / "stations.parquet"
+# The durable copy of the catalog, one row per code, in the feature store.
+STATIONS_FG_NAME = "citibike_stations"
+STATIONS_FG_VERSION = 1
+NAT = np.datetime64("NaT", "ns")
+
+_DEFAULT = None
+
+
+def default_catalog():
+    """The process-wide catalog at `STATIONS_PATH`, saved again at exit."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = StationCatalog(STATIONS_PATH)
+        atexit.register(_DEFAULT.save)
+    return _DEFAULT
+
+
+def published_catalog(store):
+    """The catalog last published to `store`, in memory only; empty when none was published."""
+    try:
+        frame = store.table(STATIONS_FG_NAME, version=STATIONS_FG_VERSION).read()
+    except KeyError:
+        frame = None
+    catalog = StationCatalog(path=None)
+    if frame is not None and len(frame):
+        catalog.merge(frame)
+    return catalog
+
+
+def pull_catalog(store, catalog=None):
+    """Merge the published catalog into the local one (`default_catalog()`) before codes are handed out.
+
+    A fresh machine gets the published codes instead of numbering stations
+    from zero again; a local catalog that disagrees with them raises.
+    """
+    catalog = catalog if catalog is not None else default_catalog()
+    catalog.merge(published_catalog(store).to_frame())
+    return catalog
+
+
+def publish_catalog(store, catalog=None):
+    """Queue an upsert of every code of the local catalog into the store's station table.
+
+    The file is re-read after saving, so codes other processes added (e.g.
+    backfill workers) are published too.
+    """
+    catalog = catalog if catalog is not None else default_catalog()
+    catalog.save()
+    if catalog.path is not None:
+        catalog = StationCatalog(catalog.path)
+    table = store.table(
+        STATIONS_FG_NAME,
+        version=STATIONS_FG_VERSION,
+        description="Citi Bike station ids and names by the int32 code used as pickup_location_id",
+        primary_key=["code"],
+    )
+    table.insert(catalog.to_frame())
+
+
+class StationCatalog:
+    """Raw station ids ("6140.05", "HB101") mapped to stable dense int32 codes.
+
+    Code `i` is row `i` of the catalog, so every per-station array downstream
+    can be indexed by code directly. Codes are handed out in order of first
+    appearance and never change; ids the catalog has not seen are appended
+    and written to disk before their codes are returned, under a file lock,
+    so concurrent workers agree on them. Names and first/last-seen times are
+    kept in memory and merged into the file by `save`. With `path=None` the
+    catalog lives in memory only.
+    """
+
+    def __init__(self, path=STATIONS_PATH):
+        self.path = Path(path) if path is not None else None
+        self.station_ids = np.array([], dtype=object)
+        self.names = np.array([], dtype=object)
+        self.first_seen = np.array([], dtype="datetime64[ns]")
+        self.last_seen = np.array([], dtype="datetime64[ns]")
+        self._index = {}
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            self._merge(pd.read_parquet(self.path))
+
+    def __len__(self):
+        return len(self.station_ids)
+
+    def encode(self, station_ids):
+        """Codes of `station_ids` (strings, or an Arrow string array), adding unseen ids."""
+        if isinstance(station_ids, pa.ChunkedArray):
+            station_ids = station_ids.combine_chunks()
+        if isinstance(station_ids, pa.Array):
+            encoded = pc.dictionary_encode(station_ids)
+            positions = encoded.indices.to_numpy(zero_copy_only=False)
+            uniques = encoded.dictionary.to_pylist()
+        else:
+            positions, uniques = pd.factorize(np.asarray(station_ids, dtype=object))
+        codes = self._lookup(uniques)
+        if (codes < 0).any():
+            self._add([s for s, code in zip(uniques, codes) if code < 0])
+            codes = self._lookup(uniques)
+        return codes[positions]
+
+    def codes(self, station_ids):
+        """Codes of `station_ids` without adding anything; -1 for unknown ids."""
+        return self._lookup(list(station_ids))
+
+    def observe(self, codes, times, names=None):
+        """Widen the first/last-seen times of `codes` and record their latest `names`."""
+        codes = np.asarray(codes, dtype=np.int64)
+        if not len(codes):
+            return
+        ns = np.asarray(times, dtype="datetime64[ns]").view(np.int64)
+        first = np.full(len(self), np.iinfo(np.int64).max)
+        last = np.full(len(self), np.iinfo(np.int64).min)
+        np.minimum.at(first, codes, ns)
+        np.maximum.at(last, codes, ns)
+        seen = np.flatnonzero(last >= first)
+        self.first_seen[seen] = np.fmin(self.first_seen[seen], first[seen].view("datetime64[ns]"))
+        self.last_seen[seen] = np.fmax(self.last_seen[seen], last[seen].view("datetime64[ns]"))
+
+        if names is not None:
+            names = np.asarray(names, dtype=object)
+            named = np.flatnonzero(pd.notna(names))
+            # Repeated indices keep the last assignment, i.e. the newest name of each station.
+            latest = np.full(len(self), -1)
+            latest[codes[named]] = named
+            renamed = np.flatnonzero(latest >= 0)
+            self.names[renamed] = names[latest[renamed]]
+        self._dirty = True
+
+    def labels(self, codes):
+        """Display label of each code: its name, else its raw id, else the code itself."""
+        codes = np.asarray(codes, dtype=np.int64)
+        known = (codes >= 0) & (codes < len(self))
+        labels = codes.astype(str).astype(object)
+        names = self.names[codes[known]]
+        labels[known] = np.where(pd.isna(names), self.station_ids[codes[known]], names)
+        return labels
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "code": np.arange(len(self), dtype=np.int32),
+            "station_id": pd.array(self.station_ids, dtype="string"),
+            "name": pd.array(self.names, dtype="string"),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        })
+
+    def merge(self, frame):
+        """Merge a catalog frame (`to_frame` layout) in, e.g. the published copy, and save it."""
+        frame = frame.sort_values("code", ignore_index=True)
+        if not (frame["code"].to_numpy() == np.arange(len(frame))).all():
+            raise ValueError("❌ Station catalog frame does not hold every code from 0 up")
+        with self._locked():
+            self._sync()
+            self._merge(frame)
+            if self.path is not None:
+                self._write()
+
+    def save(self):
+        """Merge the metadata gathered in memory into the file."""
+        if self.path is None or not self._dirty:
+            return
+        with self._locked():
+            self._sync()
+            self._write()
+
+    def _lookup(self, station_ids):
+        return np.fromiter((self._index.get(s, -1) for s in station_ids), dtype=np.int32, count=len(station_ids))
+
+    def _add(self, station_ids):
+        with self._locked():
+            self._sync()
+            new = [s for s in station_ids if s not in self._index]
+            self._extend(np.array(new, dtype=object))
+            if self.path is not None:
+                self._write()
+
+    def _extend(self, station_ids):
+        self._index.update(zip(station_ids, range(len(self), len(self) + len(station_ids))))
+        self.station_ids = np.concatenate([self.station_ids, station_ids])
+        self.names = np.concatenate([self.names, np.full(len(station_ids), None, dtype=object)])
+        self.first_seen = np.concatenate([self.first_seen, np.full(len(station_ids), NAT)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(len(station_ids), NAT)])
+
+    def _sync(self):
+        """Pick up ids and metadata other processes wrote since this catalog was read."""
+        if self.path is not None and self.path.exists():
+            self._merge(pd.read_parquet(self.path))
+
+    def _merge(self, saved):
+        saved_ids = saved["station_id"].to_numpy(dtype=object)
+        # Either side may know codes the other does not yet; the codes both know must agree.
+        n = min(len(saved_ids), len(self))
+        if (saved_ids[:n] != self.station_ids[:n]).any():
+            raise ValueError(f"❌ Station catalog {self.path} no longer matches the codes handed out")
+        self._extend(saved_ids[len(self):])
+        n = len(saved_ids)
+        names = saved["name"].to_numpy(dtype=object, na_value=None)
+        self.names[:n] = np.where(pd.isna(self.names[:n]), names, self.names[:n])
+        self.first_seen[:n] = np.fmin(self.first_seen[:n], _naive_ns(saved["first_seen"]))
+        self.last_seen[:n] = np.fmax(self.last_seen[:n], _naive_ns(saved["last_seen"]))
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.stem}-{uuid.uuid4().hex[:8]}.parquet")
+        self.to_frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    @contextmanager
+    def _locked(self):
+        if self.path is None or fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(f"{self.path.name}.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _naive_ns(times):
+    """datetime64[ns] values of a timestamp column, UTC when it is tz-aware (as read back from Hopsworks)."""
+    times = pd.to_datetime(times)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    return times.to_numpy(dtype="datetime64[ns]")
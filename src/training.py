@@ -0,0 +1,129 @@
+import hashlib
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.instrumentation import peak_rss_mb
+from src.predict import MODEL_COLUMNS
+
+CATEGORICAL_FEATURES = ["pickup_location_id"]
+
+DEFAULT_PARAMS = {
+    "objective": "regression",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "min_data_in_leaf": 20,
+    "verbose": -1,
+}
+
+
+def training_matrix(df, columns=MODEL_COLUMNS, time_col="pickup_hour", target_col="target"):
+    """Pack the training rows into one float32 matrix in chronological order.
+
+    Rows with a missing value are dropped with a mask rather than `dropna()`,
+    and columns are written one at a time, so the only full-size allocation
+    is the float32 matrix itself. Returns (X, y, times).
+    """
+    keep = df[columns + [target_col]].notna().all(axis=1).to_numpy()
+    times = df[time_col].to_numpy()
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(times[order], kind="stable")]
+
+    X = np.empty((len(order), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        X[:, j] = df[col].to_numpy()[order]
+    y = df[target_col].to_numpy()[order].astype(np.float32)
+    return X, y, times[order]
+
+
+def chronological_split(X, y, times, valid_fraction=0.1):
+    """Train on the oldest hours and validate on the newest; both are views of X, y.
+
+    The cut falls on an hour boundary so no hour is split between the two.
+    """
+    cut = int(len(X) * (1 - valid_fraction))
+    cut = np.searchsorted(times, times[cut]) if 0 < cut < len(X) else cut
+    return (X[:cut], y[:cut]), (X[cut:], y[cut:])
+
+
+def _fingerprint(*arrays):
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()[:16]
+
+
+def dataset_files(dataset_cache, train, valid):
+    """Binary Dataset paths of this train/valid split under `dataset_cache`, keyed by a hash of the inputs."""
+    key = _fingerprint(train[0], train[1], valid[0], valid[1])
+    return Path(dataset_cache) / f"{key}_train.bin", Path(dataset_cache) / f"{key}_valid.bin"
+
+
+def build_datasets(train, valid, columns=MODEL_COLUMNS, dataset_cache=None, params=None):
+    """Bin the training data once; with `dataset_cache`, reuse the binary Datasets.
+
+    The binned Datasets are saved as LightGBM binary files keyed by a hash of
+    the inputs, so later runs on the same data skip binning. Raw data is
+    freed as soon as the bins are built.
+    """
+    import lightgbm as lgb
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    if dataset_cache is not None:
+        train_bin, valid_bin = dataset_files(dataset_cache, train, valid)
+        if train_bin.exists() and valid_bin.exists():
+            print(f"♻️ Reusing binned Datasets {train_bin.stem.removesuffix('_train')}")
+            train_set = lgb.Dataset(str(train_bin), params=params, free_raw_data=True).construct()
+            valid_set = lgb.Dataset(str(valid_bin), reference=train_set, params=params, free_raw_data=True).construct()
+            return train_set, valid_set
+
+    categorical = [columns.index(col) for col in CATEGORICAL_FEATURES]
+    train_set = lgb.Dataset(
+        train[0], label=train[1], feature_name=columns, categorical_feature=categorical,
+        params=params, free_raw_data=True,
+    ).construct()
+    valid_set = lgb.Dataset(
+        valid[0], label=valid[1], reference=train_set, feature_name=columns, categorical_feature=categorical,
+        params=params, free_raw_data=True,
+    ).construct()
+
+    if dataset_cache is not None:
+        Path(dataset_cache).mkdir(parents=True, exist_ok=True)
+        train_set.save_binary(str(train_bin))
+        valid_set.save_binary(str(valid_bin))
+    return train_set, valid_set
+
+
+def train_lean(df, params=None, num_threads=1, valid_fraction=0.1, num_boost_round=2000,
+               early_stopping_rounds=50, dataset_cache=None):
+    """Time-aware, memory-lean LightGBM training.
+
+    Returns (booster, report) where the report holds the validation MAE, the
+    best iteration, fit time and peak RSS.
+    """
+    import lightgbm as lgb
+    params = {**DEFAULT_PARAMS, **(params or {}), "num_threads": num_threads}
+    start = time.perf_counter()
+    X, y, times = training_matrix(df)
+    train, valid = chronological_split(X, y, times, valid_fraction)
+    train_set, valid_set = build_datasets(train, valid, dataset_cache=dataset_cache, params=params)
+    prepare_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    booster = lgb.train(
+        params, train_set, num_boost_round=num_boost_round, valid_sets=[valid_set], valid_names=["valid"],
+        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    )
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = booster.predict(valid[0], num_iteration=booster.best_iteration, num_threads=num_threads)
+    report = {
+        "mae": float(np.mean(np.abs(valid[1] - y_pred))),
+        "best_iteration": booster.best_iteration,
+        "train_rows": len(train[0]),
+        "valid_rows": len(valid[0]),
+        "prepare_seconds": round(prepare_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    return booster, report
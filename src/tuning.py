@@ -0,0 +1,188 @@
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from src.config import MODELS_DIR
+from src.training import DEFAULT_PARAMS, build_datasets, chronological_split, dataset_files, training_matrix
+
+TUNED_PARAMS_PATH = MODELS_DIR / "tuned_params.json"
+
+# (name, low, high, scale) of every searched parameter; "int" and "log" values are drawn log-uniformly.
+SEARCH_SPACE = [
+    ("learning_rate", 0.02, 0.2, "log"),
+    ("num_leaves", 15, 255, "int"),
+    ("min_data_in_leaf", 10, 200, "int"),
+    ("feature_fraction", 0.5, 1.0, "linear"),
+    ("bagging_fraction", 0.5, 1.0, "linear"),
+    ("lambda_l2", 1e-3, 10.0, "log"),
+    ("cat_smooth", 1.0, 50.0, "log"),
+]
+
+# Set in each worker process by `_load_datasets`.
+_train_set = None
+_valid_set = None
+
+
+def sample_params(n_trials, seed=42):
+    """`n_trials` random configurations drawn from `SEARCH_SPACE`."""
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {"bagging_freq": 1}
+        for name, low, high, scale in SEARCH_SPACE:
+            if scale == "linear":
+                params[name] = round(float(rng.uniform(low, high)), 3)
+            else:
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high + (scale == "int")))))
+                params[name] = int(value) if scale == "int" else round(value, 5)
+        trials.append(params)
+    return trials
+
+
+def halving_budgets(min_rounds=50, max_rounds=2000, eta=3):
+    """Boosting rounds of each successive-halving rung: min_rounds * eta**k, capped at max_rounds."""
+    budgets = [min_rounds]
+    while budgets[-1] < max_rounds:
+        budgets.append(min(budgets[-1] * eta, max_rounds))
+    return budgets
+
+
+def _load_datasets(train_bin, valid_bin, params):
+    """Worker initializer: load the binned Datasets once per process, not once per trial."""
+    import lightgbm as lgb
+    global _train_set, _valid_set
+    _train_set = lgb.Dataset(str(train_bin), params=params, free_raw_data=True).construct()
+    _valid_set = lgb.Dataset(str(valid_bin), reference=_train_set, params=params, free_raw_data=True).construct()
+
+
+def _run_trial(trial, params, num_boost_round, early_stopping_rounds):
+    """Train one configuration for up to `num_boost_round` rounds on the worker's Datasets."""
+    import lightgbm as lgb
+    start = time.perf_counter()
+    booster = lgb.train(
+        params, _train_set, num_boost_round=num_boost_round, valid_sets=[_valid_set], valid_names=["valid"],
+        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    )
+    return {
+        "trial": trial,
+        "mae": float(booster.best_score["valid"]["l1"]),
+        "best_iteration": booster.best_iteration,
+        # Early stopping fired before the budget ran out, so more rounds would not change the result.
+        "converged": booster.best_iteration + early_stopping_rounds <= num_boost_round,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def successive_halving(df, n_trials=27, eta=3, min_rounds=50, max_rounds=2000, early_stopping_rounds=50,
+                       workers=None, time_budget=None, valid_fraction=0.1, dataset_cache=None, seed=42):
+    """Random search over `SEARCH_SPACE` with successive halving, trials in parallel processes.
+
+    The training rows are packed, split chronologically and binned once; the
+    binned Datasets are written as LightGBM binary files (under
+    `dataset_cache`/tuning, or a temporary directory) that every worker
+    process loads once at start-up. Each rung trains the surviving
+    configurations for `min_rounds * eta**k` rounds with early stopping on
+    the validation MAE and keeps the best 1/eta of them; the last one left
+    trains for up to `max_rounds`. Configurations that early-stopped are not
+    retrained. With `time_budget` (seconds), no new rung starts once it is
+    spent and the best configuration of the last finished rung wins.
+
+    Returns a summary dict: the best "params", its "num_boost_round" and
+    validation "mae", and every trial result per rung.
+    """
+    workers = workers or os.cpu_count()
+    num_threads = max(1, os.cpu_count() // workers)
+    # Without pre-filtering, trials can use any min_data_in_leaf on the same bins.
+    dataset_params = {**DEFAULT_PARAMS, "feature_pre_filter": False, "num_threads": os.cpu_count()}
+
+    start = time.perf_counter()
+    X, y, times = training_matrix(df)
+    train, valid = chronological_split(X, y, times, valid_fraction)
+    with TemporaryDirectory() as tmp_dir:
+        # Binned without pre-filtering, so kept apart from `train_lean`'s cached Datasets of the same rows.
+        train_bin, valid_bin = dataset_files(Path(dataset_cache) / "tuning" if dataset_cache else tmp_dir, train, valid)
+        if train_bin.exists() and valid_bin.exists():
+            print(f"♻️ Reusing binned Datasets {train_bin.parent}")
+        else:
+            train_set, valid_set = build_datasets(train, valid, params=dataset_params)
+            train_bin.parent.mkdir(parents=True, exist_ok=True)
+            train_set.save_binary(str(train_bin))
+            valid_set.save_binary(str(valid_bin))
+            del train_set, valid_set
+        train_rows, valid_rows = len(train[0]), len(valid[0])
+        del X, y, times, train, valid
+        prepare_seconds = time.perf_counter() - start
+
+        candidates = sample_params(n_trials, seed)
+        survivors = list(range(n_trials))
+        results = {}
+        rungs = []
+        start = time.perf_counter()
+        # Spawned, not forked: the parent has already run LightGBM's OpenMP threads.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, n_trials), mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_datasets, initargs=(train_bin, valid_bin, {**dataset_params, "num_threads": num_threads}),
+        ) as pool:
+            for budget in halving_budgets(min_rounds, max_rounds, eta):
+                # The last survivor gets the full budget, so its best iteration comes from early stopping.
+                budget = max_rounds if len(survivors) == 1 else budget
+                if time_budget is not None and rungs and time.perf_counter() - start > time_budget:
+                    print(f"⏱️ Tuning time budget spent; stopping before the {budget}-round rung")
+                    break
+                futures = [
+                    pool.submit(
+                        _run_trial, trial,
+                        {**DEFAULT_PARAMS, **candidates[trial], "metric": "l1", "num_threads": num_threads, "seed": seed},
+                        budget, early_stopping_rounds,
+                    )
+                    for trial in survivors if not results.get(trial, {}).get("converged")
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result["trial"]] = result
+                ranked = sorted(survivors, key=lambda trial: results[trial]["mae"])
+                rungs.append({"num_boost_round": budget, "trials": [dict(results[trial], rung=len(rungs)) for trial in ranked]})
+                print(f"🪜 Rung {len(rungs)}: {len(ranked)} trials x {budget} rounds, "
+                      f"best MAE = {results[ranked[0]]['mae']:.3f} ({time.perf_counter() - start:.0f}s)")
+                survivors = ranked[:max(1, math.ceil(len(ranked) / eta))]
+                if len(ranked) == 1:
+                    break
+
+    best = rungs[-1]["trials"][0]
+    return {
+        "params": candidates[best["trial"]],
+        "num_boost_round": best["best_iteration"],
+        "mae": best["mae"],
+        "trials": n_trials,
+        "train_rows": train_rows,
+        "valid_rows": valid_rows,
+        "workers": min(workers, n_trials),
+        "prepare_seconds": round(prepare_seconds, 3),
+        "search_seconds": round(time.perf_counter() - start, 3),
+        "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rungs": rungs,
+    }
+
+
+def save_tuned_params(search, path=TUNED_PARAMS_PATH):
+    """Write a `successive_halving` summary as JSON; `load_tuned_params` reads it back."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(search, indent=2))
+    return path
+
+
+def load_tuned_params(path=TUNED_PARAMS_PATH):
+    """The saved search summary, or None when no search has been run."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())